@@ -0,0 +1,178 @@
+"""
+Admission control for the prediction routes.
+
+A bounded number of requests may run the model at once; the rest wait in a
+short queue with a time budget. Requests that cannot be admitted in time, or
+whose deadline passes while running, raise so the caller can shed load (429)
+or answer from the fallback forecaster instead of piling up behind
+``model.predict``.
+
+``ProcessSlot`` is a single slot shared by every process on the host, for
+long jobs that must not occupy all of serve.py's single-threaded workers.
+"""
+
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to a per-process slot
+    fcntl = None
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted within its queue budget"""
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Overloaded):
+    """Raised when an admitted request runs past its deadline"""
+
+
+class Ticket:
+    """Handle for an admitted request, carrying its absolute deadline"""
+
+    def __init__(self, deadline):
+        self.deadline = deadline
+
+    def remaining(self):
+        return self.deadline - time.monotonic()
+
+    def check(self):
+        """Raise DeadlineExceeded if the deadline has passed"""
+        if time.monotonic() > self.deadline:
+            raise DeadlineExceeded("Request deadline exceeded")
+
+
+class AdmissionController:
+    """Concurrency limit plus queue-time budget and per-request deadline"""
+
+    def __init__(self, max_concurrent=2, max_queued=8, queue_timeout=0.5, deadline=2.0):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.deadline = deadline
+
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._in_flight = 0
+        self._service_time = 0.0  # EWMA of admitted request duration, seconds
+        self._counters = {"admitted": 0, "rejected": 0, "deadline_exceeded": 0}
+
+    def retry_after(self):
+        """Seconds a rejected client should wait, estimated from the current backlog"""
+        with self._lock:
+            backlog = self._waiting + self._in_flight
+            service_time = self._service_time or self.queue_timeout
+        return max(1, math.ceil(service_time * backlog / self.max_concurrent))
+
+    def _reject(self, reason):
+        with self._lock:
+            self._counters["rejected"] += 1
+        raise Overloaded(reason, retry_after=self.retry_after())
+
+    @contextmanager
+    def admit(self):
+        """Admit the calling request or raise Overloaded"""
+        arrived = time.monotonic()
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                queue_full = self._waiting >= self.max_queued
+                if not queue_full:
+                    self._waiting += 1
+            if queue_full:
+                self._reject("Prediction queue is full")
+
+            try:
+                acquired = self._slots.acquire(timeout=self.queue_timeout)
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+            if not acquired:
+                self._reject("Timed out waiting for a prediction slot")
+
+        started = time.monotonic()
+        with self._lock:
+            self._in_flight += 1
+            self._counters["admitted"] += 1
+        try:
+            yield Ticket(arrived + self.deadline)
+        except DeadlineExceeded:
+            with self._lock:
+                self._counters["deadline_exceeded"] += 1
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self._in_flight -= 1
+                self._service_time = elapsed if not self._service_time else 0.8 * self._service_time + 0.2 * elapsed
+            self._slots.release()
+
+    def stats(self):
+        """Snapshot of the controller state for health reporting"""
+        with self._lock:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "max_queued": self.max_queued,
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                "avg_service_time": round(self._service_time, 4),
+                **self._counters,
+            }
+
+
+class ProcessSlot:
+    """
+    One slot shared across processes, held as a non-blocking exclusive file lock.
+
+    The holder records when it started, so rejected callers are told to retry
+    once the holder's ``budget`` has run out.
+    """
+
+    def __init__(self, path, budget):
+        self.path = path
+        self.budget = budget
+        self._local = threading.Lock()
+
+    def retry_after(self):
+        try:
+            with open(self.path) as f:
+                started = float(f.read() or 0)
+        except (OSError, ValueError):
+            started = 0
+        return max(1, math.ceil(started + self.budget - time.time()))
+
+    @contextmanager
+    def admit(self):
+        """Hold the slot for the calling request or raise Overloaded; yields a Ticket for the budget"""
+        if fcntl is None:
+            if not self._local.acquire(blocking=False):
+                raise Overloaded("Another bulk job is running", retry_after=math.ceil(self.budget))
+            try:
+                yield Ticket(time.monotonic() + self.budget)
+            finally:
+                self._local.release()
+            return
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'a+') as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise Overloaded("Another bulk job is running", retry_after=self.retry_after()) from None
+            try:
+                f.seek(0)
+                f.truncate()
+                f.write(repr(time.time()))
+                f.flush()
+                yield Ticket(time.monotonic() + self.budget)
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
@@ -1,10 +1,24 @@
-from flask import Flask, jsonify, request  #type: ignore
+from flask import Flask, Response, g, jsonify, request  #type: ignore
 from flask_cors import CORS   #type: ignore
 import numpy as np
 import joblib
-import tensorflow as tf  #type: ignore
+from collections import namedtuple
 from datetime import datetime, timedelta
+import hmac
+import io
+import math
 import os
+import time
+
+from admission import AdmissionController, DeadlineExceeded, Overloaded, ProcessSlot
+from config import Config, artifact_paths
+from fallback import exponential_smoothing_forecast
+from feature_store import load_feature_store
+from finetune import load_finetune_runs, load_model_meta, start_finetune_scheduler
+from http_cache import conditional, file_digest, strong_etag
+from model_bundle import memory_usage
+from price_store import load_price_store
+from profiling import profiler, stage
 
 app = Flask(__name__)
 
@@ -23,13 +37,39 @@ CORS(app, resources={
             "https://*.vercel.app"
         ],
         "methods": ["GET", "POST", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization"],
-        "expose_headers": ["Content-Type"],
+        "allow_headers": ["Content-Type", "Authorization", "If-None-Match"],
+        "expose_headers": ["Content-Type", "ETag", "Cache-Control"],
         "supports_credentials": True,
         "max_age": 600  # Cache preflight requests for 10 minutes
     }
 })
 
+def admin_authorized():
+    """Admin surfaces are disabled unless ADMIN_TOKEN is set and sent as a bearer token"""
+    token = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    return bool(Config.ADMIN_TOKEN) and hmac.compare_digest(token.encode(), Config.ADMIN_TOKEN.encode())
+
+# Opt-in profiling; registered first so it wraps the other request hooks
+@app.before_request
+def start_profiling():
+    endpoint = request.endpoint or 'request'
+    # Admin requests must not use up armed slots or show up in the profiles
+    if endpoint.startswith('admin_'):
+        return
+    force = 'X-Profile' in request.headers and admin_authorized()
+    profiler.start_request(endpoint, force=force)
+
+@app.after_request
+def finish_profiling(response):
+    trace = profiler.finish_request()
+    if trace is not None:
+        response.headers['Server-Timing'] = profiler.server_timing(trace)
+    return response
+
+@app.teardown_request
+def discard_profiling(exc):
+    profiler.finish_request()
+
 # Add CORS headers to all responses
 @app.after_request
 def after_request(response):
@@ -51,54 +91,76 @@ def after_request(response):
     # If the origin is in our list of allowed origins, set it in the response
     if origin in allowed_origins:
         response.headers.add('Access-Control-Allow-Origin', origin)
-        response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
+        response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,If-None-Match')
         response.headers.add('Access-Control-Allow-Methods', 'GET,POST,OPTIONS')
         response.headers.add('Access-Control-Allow-Credentials', 'true')
     
     return response
 
+# Headers that can carry credentials are never written to the logs
+REDACTED_HEADERS = {'Authorization', 'Cookie', 'X-Profile'}
+
 # Add logging to see what requests are coming in
 @app.before_request
 def log_request_info():
-    print(f"Request: {request.method} {request.url}")
-    print(f"Headers: {dict(request.headers)}")
+    with stage('log_request_info'):
+        print(f"Request: {request.method} {request.url}")
+        headers = {k: '[redacted]' if k in REDACTED_HEADERS else v for k, v in request.headers.items()}
+        print(f"Headers: {headers}")
 
 @app.after_request
 def log_response_info(response):
-    print(f"Response: {response.status_code}")
+    with stage('log_response_info'):
+        print(f"Response: {response.status_code}")
     return response
 
-# Global variables to store loaded model and scaler
-model = None
-scaler = None
-last_60_prices = None
+# Loaded model, scaler and last 60 prices plus their HTTP cache validators.
+# Reloads build a new tuple and swap it in with one assignment; each request
+# reads it once through current_artifacts(), so neither its ETag nor its body
+# can mix a new model with an old window.
+Artifacts = namedtuple('Artifacts', ['model', 'scaler', 'window', 'model_version', 'window_version'])
+artifacts = Artifacts(None, None, None, None, None)
+
+def current_artifacts():
+    """This request's artifacts, read once so the cache validator and the view always agree"""
+    if 'artifacts' not in g:
+        g.artifacts = artifacts
+    return g.artifacts
+
+# Bounds how many requests queue behind model.predict; health checks bypass it
+admission = AdmissionController(
+    max_concurrent=Config.MAX_CONCURRENT_PREDICTIONS,
+    max_queued=Config.MAX_QUEUED_PREDICTIONS,
+    queue_timeout=Config.ADMISSION_QUEUE_TIMEOUT,
+    deadline=Config.PREDICTION_DEADLINE
+)
+# One bulk job at a time across all serve.py workers, each capped at BULK_TIME_BUDGET,
+# so bulk work can occupy at most one worker and never starves interactive forecasts
+bulk_admission = ProcessSlot(Config.BULK_LOCK_PATH, budget=Config.BULK_TIME_BUDGET)
+BULK_DTYPES = {'float32': np.float32, 'float64': np.float64}
+FALLBACK_MODEL_TYPE = "ExponentialSmoothing"
 
 def load_model_and_data():
     """Load the trained model, scaler, and last 60 prices"""
-    global model, scaler, last_60_prices
+    global artifacts
     
     print("Current working directory:", os.getcwd())
     print("Contents:", os.listdir('.'))
     
     try:
-        # First try models directory
-        model_path = os.path.join('backend', 'models', 'gold_price_lstm_model.h5')
-        if not os.path.exists(model_path):
-            # Then try root directory
-            model_path = 'gold_price_lstm_model.h5'
+        import tensorflow as tf  #type: ignore
+        
+        model_path, scaler_path, data_path = artifact_paths()
         
         print(f"Loading model from: {model_path}")
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Model file not found at {model_path}")
             
         model = tf.keras.models.load_model(model_path) # type: ignore
+        model_version = file_digest(model_path)
         print("Model loaded successfully")
         
         # Load the scaler
-        scaler_path = os.path.join('backend', 'models', 'gold_price_scaler.pkl')
-        if not os.path.exists(scaler_path):
-            scaler_path = 'gold_price_scaler.pkl'
-        
         print(f"Loading scaler from: {scaler_path}")
         if not os.path.exists(scaler_path):
             raise FileNotFoundError(f"Scaler file not found at {scaler_path}")
@@ -107,18 +169,16 @@ def load_model_and_data():
         print("Scaler loaded successfully")
         
         # Load the last 60 prices
-        data_path = os.path.join('backend', 'data', 'last_60_prices.npy')
-        if not os.path.exists(data_path):
-            data_path = 'last_60_prices.npy'
-        
         print(f"Loading data from: {data_path}")
         if not os.path.exists(data_path):
             raise FileNotFoundError(f"Data file not found at {data_path}")
             
         last_60_prices = np.load(data_path)
+        window_version = strong_etag(last_60_prices.dtype.str, last_60_prices.shape, last_60_prices.tobytes())
         print("Last 60 prices loaded successfully")
         print(f"Data shape: {last_60_prices.shape}")
         
+        artifacts = Artifacts(model, scaler, last_60_prices, model_version, window_version)
         return True
     except Exception as e:
         print(f"Error loading model/data: {e}")
@@ -127,18 +187,32 @@ def load_model_and_data():
         traceback.print_exc()
         return False
 
-def predict_next_price(last_60_prices_scaled):
+def install_bundle(bundle):
+    """Serve from a shared model bundle (see serve.py) instead of a private TensorFlow model"""
+    global artifacts
+    
+    artifacts = Artifacts(bundle.model, bundle.scaler, bundle.window,
+                          bundle.model_version, bundle.window_version)
+
+def predict_next_price(last_60_prices_scaled, ticket=None, current=None):
     """Predict the next gold price"""
+    model, scaler = (current or artifacts)[:2]
     if model is None or scaler is None:
         raise ValueError("Model or scaler not loaded")
     
-    input_data = last_60_prices_scaled.reshape(1, 60, 1)
-    scaled_prediction = model.predict(input_data, verbose=0)
-    predicted_price = scaler.inverse_transform(scaled_prediction)[0][0]
+    if ticket is not None:
+        ticket.check()
+    with stage('preprocess'):
+        input_data = last_60_prices_scaled.reshape(1, 60, 1)
+    with stage('model_predict'):
+        scaled_prediction = model.predict(input_data, verbose=0)
+    with stage('inverse_transform'):
+        predicted_price = scaler.inverse_transform(scaled_prediction)[0][0]
     return predicted_price
 
-def predict_multiple_days(last_60_prices_scaled, days=7):
+def predict_multiple_days(last_60_prices_scaled, days=7, ticket=None, current=None):
     """Predict gold prices for multiple days"""
+    model, scaler = (current or artifacts)[:2]
     if model is None or scaler is None:
         raise ValueError("Model or scaler not loaded")
     
@@ -146,59 +220,206 @@ def predict_multiple_days(last_60_prices_scaled, days=7):
     current_sequence = last_60_prices_scaled.copy()
     
     for _ in range(days):
-        input_data = current_sequence.reshape(1, 60, 1)
-        scaled_prediction = model.predict(input_data, verbose=0)
-        predicted_price = scaler.inverse_transform(scaled_prediction)[0][0]
+        # Give up between steps once the request deadline has passed
+        if ticket is not None:
+            ticket.check()
+        with stage('preprocess'):
+            input_data = current_sequence.reshape(1, 60, 1)
+        with stage('model_predict'):
+            scaled_prediction = model.predict(input_data, verbose=0)
+        with stage('inverse_transform'):
+            predicted_price = scaler.inverse_transform(scaled_prediction)[0][0]
         predictions.append(float(predicted_price))
         
         # Update sequence
-        current_sequence = np.roll(current_sequence, -1)
-        current_sequence[-1] = scaled_prediction[0][0]
+        with stage('preprocess'):
+            current_sequence = np.roll(current_sequence, -1)
+            current_sequence[-1] = scaled_prediction[0][0]
     
     return predictions
 
+def predict_fallback(last_60_prices_scaled, days=7, current=None):
+    """Predict gold prices with the exponential smoothing fallback"""
+    scaler = (current or artifacts).scaler
+    if scaler is None:
+        raise ValueError("Scaler not loaded")
+    
+    scaled_predictions = exponential_smoothing_forecast(last_60_prices_scaled, days=days)
+    return [float(p) for p in scaler.inverse_transform(scaled_predictions.reshape(-1, 1))[:, 0]]
+
+def predict_bulk(windows, days=7, current=None, ticket=None, batch_size=None):
+    """
+    Forecast ``days`` steps from each raw-price window in ``windows`` (n, 60).
+    
+    Windows are rolled out together in batches of ``batch_size``: each step is
+    one model.predict over the batch, reading the inputs as sliding views of
+    a (n, 60 + days) buffer instead of rolling each sequence. The ticket's
+    deadline is checked before every step.
+    """
+    model, scaler = (current or artifacts)[:2]
+    if model is None or scaler is None:
+        raise ValueError("Model or scaler not loaded")
+    
+    n = len(windows)
+    batch_size = batch_size or Config.BULK_BATCH_SIZE
+    with stage('preprocess'):
+        sequences = np.empty((n, 60 + days), dtype=np.float32)
+        sequences[:, :60] = scaler.transform(windows.reshape(-1, 1)).reshape(n, 60)
+    
+    for start in range(0, n, batch_size):
+        batch = sequences[start:start + batch_size]
+        for t in range(days):
+            if ticket is not None:
+                ticket.check()
+            with stage('model_predict'):
+                scaled_prediction = model.predict(batch[:, t:t + 60, None], batch_size=batch_size, verbose=0)
+            batch[:, 60 + t] = scaled_prediction[:, 0]
+    
+    with stage('inverse_transform'):
+        return scaler.inverse_transform(sequences[:, 60:].reshape(-1, 1)).reshape(n, days)
+
+def parse_bulk_windows():
+    """
+    Read (windows, days) from a bulk request: JSON {"windows": [[...]], "days": N},
+    JSON {"start": date, "end": date} for every stored window ending in that range,
+    or an .npy / raw float array body with ?days=N (&dtype=float32 for raw bodies).
+    """
+    if request.content_length and request.content_length > Config.MAX_BULK_BYTES:
+        raise ValueError(f"Request body larger than {Config.MAX_BULK_BYTES} bytes")
+    
+    if request.is_json:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            raise ValueError("JSON body must be an object")
+        try:
+            days = int(data.get('days', 7))
+        except (TypeError, ValueError):
+            raise ValueError("Days must be an integer") from None
+        if 'windows' in data:
+            windows = np.asarray(data['windows'], dtype=np.float64)
+        else:
+            if not os.path.exists(Config.DATASET_PATH):
+                raise ValueError("Price history not available; send 'windows' instead")
+            store = load_price_store(Config.DATASET_PATH)
+            start, stop = store.index_range(data.get('start'), data.get('end'))
+            # Windows whose last price falls in [start, stop); none when the range ends before row 59
+            start = max(start, 59)
+            stop = max(stop, start)
+            windows = np.lib.stride_tricks.sliding_window_view(store.price, 60)[start - 59:stop - 59]
+    else:
+        days = request.args.get('days', 7, type=int)
+        body = request.get_data()
+        if body[:6] == b'\x93NUMPY':
+            windows = np.load(io.BytesIO(body), allow_pickle=False)
+        else:
+            dtype = request.args.get('dtype', 'float64')
+            if dtype not in BULK_DTYPES:
+                raise ValueError(f"dtype must be one of {', '.join(BULK_DTYPES)}")
+            windows = np.frombuffer(body, dtype=np.dtype(BULK_DTYPES[dtype]).newbyteorder('<'))
+        windows = windows.astype(np.float64).reshape(-1, 60)
+    
+    if windows.ndim != 2 or windows.shape[1] != 60:
+        raise ValueError("Windows must have shape (n, 60)")
+    if len(windows) < 1 or len(windows) > Config.MAX_BULK_WINDOWS:
+        raise ValueError(f"Between 1 and {Config.MAX_BULK_WINDOWS} windows are allowed")
+    if not np.isfinite(windows).all():
+        raise ValueError("Windows must contain only finite prices")
+    if days < 1 or days > Config.MAX_PREDICTION_DAYS:
+        raise ValueError(f"Days must be between 1 and {Config.MAX_PREDICTION_DAYS}")
+    return windows, days
+
+def run_forecast(days, current):
+    """
+    Forecast from the loaded window under admission control.
+    
+    Returns (predictions, degraded). Over budget this either raises Overloaded
+    (OVERLOAD_MODE=reject) or answers from the fallback forecaster.
+    """
+    try:
+        with stage('forecast'), admission.admit() as ticket:
+            if days == 1:
+                return [float(predict_next_price(current.window, ticket, current))], False
+            return predict_multiple_days(current.window, days=days, ticket=ticket, current=current), False
+    except Overloaded:
+        if Config.OVERLOAD_MODE == 'reject':
+            raise
+        with stage('fallback'):
+            return predict_fallback(current.window, days=days, current=current), True
+
+def forecast_response(payload, degraded):
+    """JSON response for a forecast, flagged and marked uncacheable when degraded"""
+    payload["model_type"] = FALLBACK_MODEL_TYPE if degraded else "LSTM"
+    payload["degraded"] = degraded
+    with stage('json_encode'):
+        response = jsonify(payload)
+    if degraded:
+        response.cache_control.no_store = True
+    return response
+
+def overloaded_response(error):
+    """429 response telling the client when to retry"""
+    response = jsonify({"error": str(error), "retry_after": error.retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+def forecast_validator():
+    """ETag for the deterministic GET endpoints, or None while nothing is loaded"""
+    current = current_artifacts()
+    if current.model is None or current.scaler is None or current.window is None:
+        return None
+    # Forecast dates are relative to today, so the day is part of the validator
+    return strong_etag(request.path, current.model_version, current.window_version,
+                       datetime.now().strftime('%Y-%m-%d'))
+
 @app.route('/api/predict/next', methods=['GET'])
+@conditional(forecast_validator, refresh_hour=Config.DATA_REFRESH_HOUR)
 def predict_next():
     """API endpoint to predict next day's gold price"""
     try:
-        if model is None or scaler is None or last_60_prices is None:
+        current = current_artifacts()
+        if current.model is None or current.scaler is None or current.window is None:
             return jsonify({"error": "Model not loaded"}), 500
             
-        prediction = predict_next_price(last_60_prices)
+        predictions, degraded = run_forecast(1, current)
         
-        return jsonify({
+        return forecast_response({
             "success": True,
-            "prediction": float(prediction),
+            "prediction": predictions[0],
             "currency": "USD",
             "unit": "per ounce",
-            "prediction_date": (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d'),
-            "model_type": "LSTM"
-        })
+            "prediction_date": (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+        }, degraded)
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/predict/week', methods=['GET'])
+@conditional(forecast_validator, refresh_hour=Config.DATA_REFRESH_HOUR)
 def predict_week():
     """API endpoint to predict gold prices for the next 7 days"""
     try:
-        if model is None or scaler is None or last_60_prices is None:
+        current = current_artifacts()
+        if current.model is None or current.scaler is None or current.window is None:
             return jsonify({"error": "Model not loaded"}), 500
             
-        predictions = predict_multiple_days(last_60_prices, days=7)
+        predictions, degraded = run_forecast(7, current)
         
         # Create date predictions
         dates = []
         for i in range(1, 8):
             dates.append((datetime.now() + timedelta(days=i)).strftime('%Y-%m-%d'))
         
-        return jsonify({
+        return forecast_response({
             "success": True,
             "predictions": predictions,
             "dates": dates,
             "currency": "USD",
-            "unit": "per ounce",
-            "model_type": "LSTM"
-        })
+            "unit": "per ounce"
+        }, degraded)
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -206,7 +427,8 @@ def predict_week():
 def predict_custom():
     """API endpoint to predict gold prices for custom number of days"""
     try:
-        if model is None or scaler is None or last_60_prices is None:
+        current = current_artifacts()
+        if current.model is None or current.scaler is None or current.window is None:
             return jsonify({"error": "Model not loaded"}), 500
             
         data = request.get_json()
@@ -215,55 +437,245 @@ def predict_custom():
         if days < 1 or days > 30:
             return jsonify({"error": "Days must be between 1 and 30"}), 400
             
-        predictions = predict_multiple_days(last_60_prices, days=days)
+        predictions, degraded = run_forecast(days, current)
         
         # Create date predictions
         dates = []
         for i in range(1, days + 1):
             dates.append((datetime.now() + timedelta(days=i)).strftime('%Y-%m-%d'))
         
-        return jsonify({
+        return forecast_response({
             "success": True,
             "predictions": predictions,
             "dates": dates,
             "currency": "USD",
             "unit": "per ounce",
-            "model_type": "LSTM",
             "days_predicted": days
-        })
+        }, degraded)
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/predict/bulk', methods=['POST'])
+def predict_bulk_windows():
+    """API endpoint to forecast many caller-supplied 60-day price windows in one batch"""
+    try:
+        current = current_artifacts()
+        if current.model is None or current.scaler is None:
+            return jsonify({"error": "Model not loaded"}), 500
+        
+        try:
+            with stage('parse'):
+                windows, days = parse_bulk_windows()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        try:
+            with stage('forecast'), bulk_admission.admit() as ticket:
+                started = time.perf_counter()
+                trajectories = predict_bulk(windows, days=days, current=current, ticket=ticket)
+                elapsed = time.perf_counter() - started
+        except DeadlineExceeded:
+            # Running out of time says as much about server load as about job size
+            retry_after = max(1, math.ceil(bulk_admission.budget))
+            response = jsonify({"error": f"Bulk job exceeded the {bulk_admission.budget:g}s time budget; "
+                                         "retry later or split it into smaller requests",
+                                "retry_after": retry_after})
+            response.status_code = 503
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+        
+        stats = {
+            "windows": len(windows),
+            "days_predicted": days,
+            "elapsed_seconds": round(elapsed, 4),
+            "windows_per_sec": round(len(windows) / elapsed, 1) if elapsed > 0 else None
+        }
+        
+        if request.accept_mimetypes.best == 'application/x-npy':
+            buffer = io.BytesIO()
+            np.save(buffer, trajectories)
+            response = Response(buffer.getvalue(), mimetype='application/x-npy')
+            response.headers['X-Windows-Per-Sec'] = str(stats["windows_per_sec"])
+            return response
+        
+        with stage('json_encode'):
+            return jsonify({
+                "success": True,
+                "trajectories": trajectories.tolist(),
+                "currency": "USD",
+                "unit": "per ounce",
+                "model_type": "LSTM",
+                **stats
+            })
+    except Overloaded as e:
+        return overloaded_response(e)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def training_info():
+    """This request's (release metadata, latest fine-tune run), read once like the artifacts"""
+    if 'training_info' not in g:
+        runs = load_finetune_runs()
+        g.training_info = load_model_meta(artifact_paths()[0]), runs[-1] if runs else None
+    return g.training_info
+
+def model_info_validator():
+    """Forecast validator plus the release and latest fine-tune run, which also appear in the body"""
+    etag = forecast_validator()
+    if etag is None:
+        return None
+    meta, last_run = training_info()
+    return strong_etag(etag, meta.get("release"), last_run and last_run.get("timestamp"))
+
 @app.route('/api/model/info', methods=['GET'])
+@conditional(model_info_validator, refresh_hour=Config.DATA_REFRESH_HOUR)
 def model_info():
     """API endpoint to get model information"""
     try:
+        current = current_artifacts()
+        meta, last_run = training_info()
         return jsonify({
             "success": True,
             "model_type": "LSTM",
             "window_size": 60,
-            "model_loaded": model is not None,
-            "scaler_loaded": scaler is not None,
-            "data_loaded": last_60_prices is not None,
-            "last_training_date": "2023-08-17",
+            "model_loaded": current.model is not None,
+            "scaler_loaded": current.scaler is not None,
+            "data_loaded": current.window is not None,
+            "last_training_date": meta.get("last_training_date") or "2023-08-17",
+            "last_finetune": meta.get("last_finetune"),
+            "last_finetune_run": last_run,
             "accuracy": "~96%",
             "description": "LSTM model trained on 10 years of gold price data (2013-2023)"
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def history_validator():
+    """ETag for history responses: the query plus the price store version"""
+    if not os.path.exists(Config.DATASET_PATH):
+        return None
+    return strong_etag(request.full_path, load_price_store(Config.DATASET_PATH).manifest["sha256"])
+
+@app.route('/api/history', methods=['GET'])
+@conditional(history_validator, refresh_hour=Config.DATA_REFRESH_HOUR)
+def price_history():
+    """API endpoint to get historical prices, optionally limited by start/end date or last N days"""
+    try:
+        if not os.path.exists(Config.DATASET_PATH):
+            return jsonify({"error": "Price history not available"}), 404
+        
+        store = load_price_store(Config.DATASET_PATH)
+        start, stop = store.index_range(request.args.get('start'), request.args.get('end'))
+        days = request.args.get('days', type=int)
+        if days is not None:
+            if days < 1:
+                return jsonify({"error": "Days must be positive"}), 400
+            start = max(start, stop - days)
+        
+        return jsonify({
+            "success": True,
+            "dates": store.date_strings(start, stop).tolist(),
+            "prices": store.price[start:stop].tolist(),
+            "open": store.column('open')[start:stop].tolist(),
+            "high": store.column('high')[start:stop].tolist(),
+            "low": store.column('low')[start:stop].tolist(),
+            "currency": "USD",
+            "unit": "per ounce"
+        })
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def features_validator():
+    """ETag for feature responses: the query, the price store version and the streamed row count"""
+    if not os.path.exists(Config.DATASET_PATH):
+        return None
+    features = load_feature_store(load_price_store(Config.DATASET_PATH))
+    return strong_etag(request.full_path, features.manifest["source_sha256"], len(features))
+
+@app.route('/api/features', methods=['GET'])
+@conditional(features_validator, refresh_hour=Config.DATA_REFRESH_HOUR)
+def price_features():
+    """API endpoint to get technical indicators (SMA/EMA, volatility, RSI, ATR, returns) for the last N days"""
+    try:
+        if not os.path.exists(Config.DATASET_PATH):
+            return jsonify({"error": "Price history not available"}), 404
+        
+        features = load_feature_store(load_price_store(Config.DATASET_PATH))
+        days = request.args.get('days', 90, type=int)
+        if days < 1:
+            return jsonify({"error": "Days must be positive"}), 400
+        columns = request.args.get('columns')
+        columns = columns.split(',') if columns else features.manifest["columns"]
+        
+        start = max(len(features) - days, 0)
+        dates = features.dates[start:].astype('datetime64[D]')
+        
+        # Warm-up rows are NaN, which JSON cannot carry
+        def values(name):
+            column = np.asarray(features.column(name)[start:])
+            return [None if np.isnan(v) else v for v in column.tolist()]
+        
+        return jsonify({
+            "success": True,
+            "dates": np.datetime_as_string(dates).tolist(),
+            "features": {name: values(name) for name in columns},
+            "params": features.manifest["params"]
+        })
+    except KeyError as e:
+        return jsonify({"error": str(e.args[0])}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "model_loaded": model is not None,
-        "scaler_loaded": scaler is not None,
-        "data_loaded": last_60_prices is not None,
+        "model_loaded": current_artifacts().model is not None,
+        "scaler_loaded": current_artifacts().scaler is not None,
+        "data_loaded": current_artifacts().window is not None,
+        "admission": admission.stats(),
+        "process": memory_usage(),
         "working_directory": os.getcwd()
     })
 
+@app.route('/api/admin/profile', methods=['GET', 'POST'])
+def admin_profile():
+    """Arm profiling for the next N requests (POST) or get the per-stage summary (GET)"""
+    if not admin_authorized():
+        return jsonify({"error": "Not found"}), 404
+    
+    try:
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            if data.get('reset'):
+                profiler.reset()
+            profiler.arm(data.get('requests', 10), data.get('sample_rate', 1.0))
+        return jsonify(profiler.summary())
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/api/admin/profile/<fmt>', methods=['GET'])
+def admin_profile_export(fmt):
+    """Export aggregated profiles as collapsed stacks ('folded') or a pstats dump ('pstats')"""
+    if not admin_authorized():
+        return jsonify({"error": "Not found"}), 404
+    
+    if fmt == 'folded':
+        return Response(profiler.folded(), mimetype='text/plain')
+    if fmt == 'pstats':
+        dump = profiler.pstats_dump()
+        if dump is None:
+            return jsonify({"error": "No profiled requests yet"}), 404
+        return Response(dump, mimetype='application/octet-stream',
+                        headers={'Content-Disposition': 'attachment; filename=profile.pstats'})
+    return jsonify({"error": "Format must be 'folded' or 'pstats'"}), 400
+
 @app.route('/api/test', methods=['GET'])
 def test_endpoint():
     """Simple test endpoint"""
@@ -285,7 +697,10 @@ def root():
             "/api/model/info",
             "/api/predict/next",
             "/api/predict/week",
-            "/api/predict/custom"
+            "/api/predict/custom",
+            "/api/predict/bulk",
+            "/api/history",
+            "/api/features"
         ]
     })
 
@@ -294,6 +709,10 @@ if __name__ == '__main__':
     if not load_model_and_data():
         print("Failed to load model and data")
     
+    # Periodically fine-tune on newly ingested closes and reload what it publishes
+    if Config.FINETUNE_INTERVAL_HOURS > 0:
+        start_finetune_scheduler(Config.FINETUNE_INTERVAL_HOURS, on_publish=load_model_and_data)
+    
     # Get port from environment variable or use default
     port = int(os.environ.get('PORT', 5000))
     
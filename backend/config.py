@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 class Config:
@@ -19,6 +20,42 @@ class Config:
     WINDOW_SIZE = 60
     MAX_PREDICTION_DAYS = 30
     
+    # Bulk forecasting (/api/predict/bulk)
+    MAX_BULK_WINDOWS = int(os.environ.get('MAX_BULK_WINDOWS', 20000))
+    MAX_BULK_BYTES = int(os.environ.get('MAX_BULK_BYTES', 64 * 1024 * 1024))
+    BULK_BATCH_SIZE = int(os.environ.get('BULK_BATCH_SIZE', 1024))
+    # One bulk job runs at a time across all processes (BULK_LOCK_PATH) and gives up after the budget
+    BULK_TIME_BUDGET = float(os.environ.get('BULK_TIME_BUDGET', 30))
+    BULK_LOCK_PATH = os.environ.get('BULK_LOCK_PATH') or os.path.join(tempfile.gettempdir(), 'gold-price-bulk.lock')
+    
+    # Enables the /api/admin endpoints and the X-Profile request header when set
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+    
+    # Training data used by the notebook and the fine-tuning job
+    DATASET_PATH = os.environ.get('DATASET_PATH') or os.path.join('dataset', 'gold prices.csv')
+    
+    # Incremental fine-tuning (FINETUNE_INTERVAL_HOURS=0 disables the background job)
+    FINETUNE_INTERVAL_HOURS = float(os.environ.get('FINETUNE_INTERVAL_HOURS', 0))
+    FINETUNE_EPOCHS = int(os.environ.get('FINETUNE_EPOCHS', 3))
+    FINETUNE_CPU_BUDGET_SECONDS = float(os.environ.get('FINETUNE_CPU_BUDGET_SECONDS', 300))
+    FINETUNE_RECENT_WINDOWS = int(os.environ.get('FINETUNE_RECENT_WINDOWS', 250))
+    FINETUNE_HISTORICAL_SAMPLE = int(os.environ.get('FINETUNE_HISTORICAL_SAMPLE', 500))
+    FINETUNE_HOLDOUT_WINDOWS = int(os.environ.get('FINETUNE_HOLDOUT_WINDOWS', 20))
+    FINETUNE_LEARNING_RATE = float(os.environ.get('FINETUNE_LEARNING_RATE', 1e-4))
+    FINETUNE_THREADS = int(os.environ.get('FINETUNE_THREADS', 2))
+    FINETUNE_KEEP_RELEASES = int(os.environ.get('FINETUNE_KEEP_RELEASES', 2))
+    FINETUNE_RUN_HISTORY = int(os.environ.get('FINETUNE_RUN_HISTORY', 30))
+    
+    # HTTP caching: hour of day (server local time) at which new data lands
+    DATA_REFRESH_HOUR = int(os.environ.get('DATA_REFRESH_HOUR', 0))
+    
+    # Admission control for the prediction routes
+    MAX_CONCURRENT_PREDICTIONS = int(os.environ.get('MAX_CONCURRENT_PREDICTIONS', 2))
+    MAX_QUEUED_PREDICTIONS = int(os.environ.get('MAX_QUEUED_PREDICTIONS', 8))
+    ADMISSION_QUEUE_TIMEOUT = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT', 0.5))  # seconds
+    PREDICTION_DEADLINE = float(os.environ.get('PREDICTION_DEADLINE', 2.0))  # seconds
+    OVERLOAD_MODE = os.environ.get('OVERLOAD_MODE', 'fallback')  # 'fallback' or 'reject'
+    
     # CORS Configuration
     CORS_ORIGINS = ['http://localhost:3000', 'http://localhost:5173', 'http://127.0.0.1:3000', 'http://127.0.0.1:5173']
     
@@ -31,6 +68,47 @@ class ProductionConfig(Config):
     DEBUG = False
     API_HOST = '0.0.0.0'
     
+RELEASES_DIRNAME = 'releases'
+CURRENT_FILE = 'CURRENT'
+
+def releases_dir():
+    """Fine-tuned releases live next to the base model"""
+    return os.path.join(os.path.dirname(artifact_paths(release=False)[0]), RELEASES_DIRNAME)
+
+def current_release():
+    """Directory of the live fine-tuned release, or None before the first publish"""
+    directory = releases_dir()
+    try:
+        with open(os.path.join(directory, CURRENT_FILE)) as f:
+            release_id = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(directory, release_id) if release_id else None
+
+def artifact_paths(release=True):
+    """
+    Resolve the model, scaler and data paths, preferring the backend directories.
+    
+    With ``release`` the model and window come from the current fine-tuned
+    release when there is one; the pointer is read once, so the pair always
+    belongs to the same release.
+    """
+    paths = []
+    for subdir, filename in [('models', 'gold_price_lstm_model.h5'),
+                             ('models', 'gold_price_scaler.pkl'),
+                             ('data', 'last_60_prices.npy')]:
+        path = os.path.join('backend', subdir, filename)
+        if not os.path.exists(path):
+            # Then try root directory
+            path = filename
+        paths.append(path)
+    
+    directory = current_release() if release else None
+    if directory is not None:
+        paths[0] = os.path.join(directory, os.path.basename(paths[0]))
+        paths[2] = os.path.join(directory, os.path.basename(paths[2]))
+    return tuple(paths)
+    
 config = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
@@ -0,0 +1,46 @@
+"""
+Cheap statistical fallback forecaster used when the LSTM is over budget.
+
+Holt-style exponential smoothing over the same scaled 60-day window the model
+sees. Level and trend are closed-form exponentially weighted sums, so a
+forecast is a couple of dot products and works on a single window or a
+batch of windows alike.
+"""
+
+import numpy as np
+
+
+def _smoothing_weights(n, alpha):
+    """Weights of an exponential smoother over n points, oldest first, summing to 1"""
+    weights = alpha * (1 - alpha) ** np.arange(n - 1, -1, -1, dtype=np.float64)
+    # The oldest observation seeds the smoother and keeps the remaining mass
+    weights[0] = (1 - alpha) ** (n - 1)
+    return weights
+
+
+def exponential_smoothing_forecast(windows, days=7, alpha=0.5, beta=0.3):
+    """
+    Forecast ``days`` steps ahead from scaled windows.
+
+    Args:
+        windows: Array of shape (window,), (window, 1) or (batch, window)
+        days: Number of steps to forecast
+        alpha: Smoothing factor for the level
+        beta: Smoothing factor for the trend
+
+    Returns:
+        Scaled forecasts of shape (days,) for a single window or (batch, days)
+    """
+    windows = np.asarray(windows, dtype=np.float64)
+    single = windows.ndim == 1 or (windows.ndim == 2 and windows.shape[1] == 1)
+    series = windows.reshape(1, -1) if single else windows
+
+    level_weights = _smoothing_weights(series.shape[1], alpha)
+    trend = np.diff(series, axis=1) @ _smoothing_weights(series.shape[1] - 1, beta)
+    # A weighted average lags a trending series; shift it forward to the last step
+    lag = level_weights @ np.arange(series.shape[1] - 1, -1, -1, dtype=np.float64)
+    level = series @ level_weights + trend * lag
+
+    horizon = np.arange(1, days + 1, dtype=np.float64)
+    forecasts = level[:, None] + trend[:, None] * horizon[None, :]
+    return forecasts[0] if single else forecasts
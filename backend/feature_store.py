@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+
+"""
+Technical-indicator feature store persisted next to the price store.
+
+Indicators (returns, SMA, EMA, rolling volatility, RSI, ATR) are backfilled
+over the full history in one vectorized pass, then kept current by
+streaming each new bar through ``IndicatorState``, which updates every
+indicator in O(1). Columns are raw float64/int64 files that new rows are
+appended to; the manifest records the committed row count together with the
+streaming state and is replaced atomically, so readers never see a partial
+row. Writers hold an exclusive file lock and first cut every column back to
+the committed row count, so an interrupted append leaves nothing behind.
+Bars are streamed in by the ingest step (``finetune.py --ingest``); readers
+only backfill a missing store. Warm-up rows hold NaN.
+
+Usage:
+    python backend/feature_store.py
+"""
+
+import json
+import math
+import os
+import sys
+import tempfile
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: the single-process development server needs no lock
+    fcntl = None
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from config import Config
+
+FEATURES_DIRNAME = 'features'
+MANIFEST_FILE = 'manifest.json'
+LOCK_FILE = '.lock'
+DATE_COLUMN = 'date'
+
+SMA_WINDOWS = (20, 50)
+EMA_SPANS = (12, 26)
+VOLATILITY_WINDOW = 20
+RSI_PERIOD = 14
+ATR_PERIOD = 14
+
+PARAMS = {
+    "sma_windows": list(SMA_WINDOWS),
+    "ema_spans": list(EMA_SPANS),
+    "volatility_window": VOLATILITY_WINDOW,
+    "rsi_period": RSI_PERIOD,
+    "atr_period": ATR_PERIOD,
+}
+
+FEATURE_COLUMNS = (
+    ['close', 'return', 'log_return']
+    + [f'sma_{n}' for n in SMA_WINDOWS]
+    + [f'ema_{n}' for n in EMA_SPANS]
+    + [f'volatility_{VOLATILITY_WINDOW}', f'rsi_{RSI_PERIOD}', f'atr_{ATR_PERIOD}']
+)
+
+
+def _rsi(avg_gain, avg_loss):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + avg_gain / avg_loss))
+
+
+def compute_indicators(close, high=None, low=None):
+    """
+    Vectorized backfill over a full price history.
+
+    Returns ({column: float64 array}, IndicatorState positioned after the last bar).
+    Missing high/low fall back to the close, making ATR a close-to-close range.
+    """
+    import pandas as pd
+
+    close = np.asarray(close, dtype=np.float64)
+    high = close if high is None else np.asarray(high, dtype=np.float64)
+    low = close if low is None else np.asarray(low, dtype=np.float64)
+    n = len(close)
+    count = np.arange(1, n + 1)
+    s = pd.Series(close)
+
+    returns = pd.Series(np.concatenate([[np.nan], close[1:] / close[:-1] - 1]))
+    log_returns = np.concatenate([[np.nan], np.diff(np.log(close))])
+    features = {'close': close, 'return': returns.to_numpy(), 'log_return': log_returns}
+    for w in SMA_WINDOWS:
+        features[f'sma_{w}'] = s.rolling(w).mean().to_numpy()
+
+    ema = {}
+    for span in EMA_SPANS:
+        ema[span] = s.ewm(span=span, adjust=False).mean().to_numpy()
+        features[f'ema_{span}'] = np.where(count >= span, ema[span], np.nan)
+
+    features[f'volatility_{VOLATILITY_WINDOW}'] = returns.rolling(VOLATILITY_WINDOW).std().to_numpy()
+
+    delta = s.diff()
+    avg_gain = delta.clip(lower=0).ewm(alpha=1 / RSI_PERIOD, adjust=False).mean().to_numpy()
+    avg_loss = (-delta).clip(lower=0).ewm(alpha=1 / RSI_PERIOD, adjust=False).mean().to_numpy()
+    features[f'rsi_{RSI_PERIOD}'] = np.where(count > RSI_PERIOD, _rsi(avg_gain, avg_loss), np.nan)
+
+    prev_close = np.concatenate([[np.nan], close[:-1]])
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    atr = pd.Series(true_range).ewm(alpha=1 / ATR_PERIOD, adjust=False).mean().to_numpy()
+    features[f'atr_{ATR_PERIOD}'] = np.where(count >= ATR_PERIOD, atr, np.nan)
+
+    state = IndicatorState()
+    if n:
+        state.count = n
+        state.prev_close = float(close[-1])
+        for w in SMA_WINDOWS:
+            state.sma[w] = deque(close[-w:].tolist(), maxlen=w)
+            state.sma_sum[w] = float(np.sum(close[-w:]))
+        state.ema = {span: float(ema[span][-1]) for span in EMA_SPANS}
+        tail_returns = returns.to_numpy()[1:][-VOLATILITY_WINDOW:]
+        state.returns = deque(tail_returns.tolist(), maxlen=VOLATILITY_WINDOW)
+        state.returns_sum = float(np.sum(tail_returns))
+        state.returns_sumsq = float(np.sum(tail_returns ** 2))
+        if n > 1:
+            state.avg_gain, state.avg_loss = float(avg_gain[-1]), float(avg_loss[-1])
+        state.atr = float(atr[-1])
+    return features, state
+
+
+class IndicatorState:
+    """Running indicator state; ``update`` folds in one bar in O(1)"""
+
+    def __init__(self):
+        self.count = 0
+        self.prev_close = None
+        self.sma = {w: deque(maxlen=w) for w in SMA_WINDOWS}
+        self.sma_sum = {w: 0.0 for w in SMA_WINDOWS}
+        self.ema = {}
+        self.returns = deque(maxlen=VOLATILITY_WINDOW)
+        self.returns_sum = 0.0
+        self.returns_sumsq = 0.0
+        self.avg_gain = None
+        self.avg_loss = None
+        self.atr = None
+
+    def update(self, close, high=None, low=None):
+        """Add one bar and return its feature row"""
+        high = close if high is None else high
+        low = close if low is None else low
+        prev = self.prev_close
+        self.count += 1
+        row = {'close': close, 'return': math.nan, 'log_return': math.nan}
+
+        for w in SMA_WINDOWS:
+            window = self.sma[w]
+            if len(window) == w:
+                self.sma_sum[w] -= window[0]
+            window.append(close)
+            self.sma_sum[w] += close
+            row[f'sma_{w}'] = self.sma_sum[w] / w if len(window) == w else math.nan
+
+        for span in EMA_SPANS:
+            alpha = 2 / (span + 1)
+            self.ema[span] = close if span not in self.ema else self.ema[span] + alpha * (close - self.ema[span])
+            row[f'ema_{span}'] = self.ema[span] if self.count >= span else math.nan
+
+        row[f'volatility_{VOLATILITY_WINDOW}'] = math.nan
+        row[f'rsi_{RSI_PERIOD}'] = math.nan
+        if prev is not None:
+            ret = close / prev - 1
+            row['return'] = ret
+            row['log_return'] = math.log(close / prev)
+
+            if len(self.returns) == VOLATILITY_WINDOW:
+                oldest = self.returns[0]
+                self.returns_sum -= oldest
+                self.returns_sumsq -= oldest * oldest
+            self.returns.append(ret)
+            self.returns_sum += ret
+            self.returns_sumsq += ret * ret
+            if len(self.returns) == VOLATILITY_WINDOW:
+                k = VOLATILITY_WINDOW
+                variance = (self.returns_sumsq - self.returns_sum ** 2 / k) / (k - 1)
+                row[f'volatility_{VOLATILITY_WINDOW}'] = math.sqrt(max(variance, 0.0))
+
+            gain, loss = max(close - prev, 0.0), max(prev - close, 0.0)
+            alpha = 1 / RSI_PERIOD
+            if self.avg_gain is None:
+                self.avg_gain, self.avg_loss = gain, loss
+            else:
+                self.avg_gain += alpha * (gain - self.avg_gain)
+                self.avg_loss += alpha * (loss - self.avg_loss)
+            if self.count > RSI_PERIOD:
+                row[f'rsi_{RSI_PERIOD}'] = float(_rsi(self.avg_gain, self.avg_loss))
+
+        true_range = high - low if prev is None else max(high - low, abs(high - prev), abs(low - prev))
+        self.atr = true_range if self.atr is None else self.atr + (true_range - self.atr) / ATR_PERIOD
+        row[f'atr_{ATR_PERIOD}'] = self.atr if self.count >= ATR_PERIOD else math.nan
+
+        self.prev_close = close
+        return row
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "prev_close": self.prev_close,
+            "sma": {str(w): list(self.sma[w]) for w in SMA_WINDOWS},
+            "ema": {str(span): value for span, value in self.ema.items()},
+            "returns": list(self.returns),
+            "avg_gain": self.avg_gain,
+            "avg_loss": self.avg_loss,
+            "atr": self.atr,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls()
+        state.count = data["count"]
+        state.prev_close = data["prev_close"]
+        for w in SMA_WINDOWS:
+            state.sma[w].extend(data["sma"][str(w)])
+            state.sma_sum[w] = float(sum(state.sma[w]))
+        state.ema = {int(span): value for span, value in data["ema"].items()}
+        state.returns.extend(data["returns"])
+        state.returns_sum = float(sum(state.returns))
+        state.returns_sumsq = float(sum(r * r for r in state.returns))
+        state.avg_gain = data["avg_gain"]
+        state.avg_loss = data["avg_loss"]
+        state.atr = data["atr"]
+        return state
+
+
+class FeatureStore:
+    """Append-only feature columns for one price store version"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._load_manifest()
+
+    def _load_manifest(self):
+        with open(os.path.join(self.directory, MANIFEST_FILE)) as f:
+            self.manifest = json.load(f)
+
+    def __len__(self):
+        return self.manifest["rows"]
+
+    def _path(self, name):
+        return os.path.join(self.directory, f'{name}.i64' if name == DATE_COLUMN else f'{name}.f64')
+
+    def column(self, name):
+        """Memory-mapped column covering the committed rows"""
+        if name != DATE_COLUMN and name not in self.manifest["columns"]:
+            raise KeyError(f"Unknown feature column: {name}")
+        if not len(self):
+            return np.empty(0, dtype=np.int64 if name == DATE_COLUMN else np.float64)
+        dtype = np.int64 if name == DATE_COLUMN else np.float64
+        return np.memmap(self._path(name), dtype=dtype, mode='r', shape=(len(self),))
+
+    @property
+    def dates(self):
+        return self.column(DATE_COLUMN)
+
+    @property
+    def last_date(self):
+        return str(np.datetime64(int(self.dates[-1]), 'D')) if len(self) else None
+
+    def append(self, date, close, high=None, low=None):
+        """Stream one new bar into the store"""
+        return self._write([(date, close, high, low)], strict=True)[0]
+
+    def extend(self, closes):
+        """Stream the (date, price) closes newer than the last stored bar; returns how many were added"""
+        return len(self._write([(date, price, None, None) for date, price in closes], strict=False))
+
+    def _write(self, bars, strict):
+        with _writer_lock(self.directory):
+            # Another writer may have committed rows since this store was opened
+            self._load_manifest()
+            state = IndicatorState.from_dict(self.manifest["state"])
+            last_day = int(self.dates[-1]) if len(self) else None
+
+            days, rows = [], []
+            for date, close, high, low in bars:
+                day = int(np.datetime64(date, 'D').astype(np.int64))
+                if last_day is not None and day <= last_day:
+                    if strict:
+                        raise ValueError(f"Bar for {date} is not newer than {self.last_date}")
+                    continue
+                rows.append(state.update(float(close), high, low))
+                days.append(day)
+                last_day = day
+            if not rows:
+                return rows
+
+            committed = len(self)
+            _append_column(self._path(DATE_COLUMN), committed, np.asarray(days, dtype=np.int64))
+            for name in self.manifest["columns"]:
+                _append_column(self._path(name), committed,
+                               np.asarray([row[name] for row in rows], dtype=np.float64))
+
+            self.manifest["rows"] = committed + len(rows)
+            self.manifest["state"] = state.to_dict()
+            _write_manifest(self.directory, self.manifest)
+        return rows
+
+    def windows(self, columns, size, start=0, stop=None):
+        """Sliding windows of shape (n, size, len(columns)) over rows [start, stop)"""
+        stop = len(self) if stop is None else stop
+        data = np.stack([np.asarray(self.column(c)[start:stop]) for c in columns], axis=1)
+        return np.lib.stride_tricks.sliding_window_view(data, size, axis=0).transpose(0, 2, 1)
+
+
+@contextmanager
+def _writer_lock(directory):
+    """Exclusive lock serialising writers across threads and processes"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, LOCK_FILE), 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def _append_column(path, committed, values):
+    """Write values after the committed rows, dropping anything an interrupted writer left past them"""
+    offset = committed * values.itemsize
+    with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+        f.truncate(offset)
+        f.seek(offset)
+        f.write(values.tobytes())
+
+
+def _write_manifest(directory, manifest):
+    fd, tmp_path = tempfile.mkstemp(dir=directory)
+    with os.fdopen(fd, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, os.path.join(directory, MANIFEST_FILE))
+
+
+def _write_column(path, values):
+    # Replaced rather than rewritten so open memory maps keep the old pages
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'wb') as f:
+        f.write(values.tobytes())
+    os.replace(tmp_path, path)
+
+
+def _backfill(price_store, directory):
+    features, state = compute_indicators(price_store.price, price_store.column('high'), price_store.column('low'))
+    _write_column(os.path.join(directory, f'{DATE_COLUMN}.i64'), np.asarray(price_store.dates, dtype=np.int64))
+    for name in FEATURE_COLUMNS:
+        _write_column(os.path.join(directory, f'{name}.f64'), np.asarray(features[name], dtype=np.float64))
+    # The manifest is committed last
+    _write_manifest(directory, {
+        "rows": len(price_store),
+        "columns": FEATURE_COLUMNS,
+        "params": PARAMS,
+        "source_sha256": price_store.manifest["sha256"],
+        "state": state.to_dict(),
+    })
+
+
+def _open_current(directory):
+    """The store in ``directory`` if it exists and was built with the current parameters, else None"""
+    try:
+        store = FeatureStore(directory)
+    except (OSError, ValueError, KeyError):
+        return None
+    if store.manifest.get("params") != PARAMS or store.manifest.get("columns") != FEATURE_COLUMNS:
+        return None
+    return store
+
+
+def build_features(price_store):
+    """Backfill the feature store for a price store in one vectorized pass"""
+    directory = os.path.join(price_store.directory, FEATURES_DIRNAME)
+    with _writer_lock(directory):
+        _backfill(price_store, directory)
+    return FeatureStore(directory)
+
+
+def load_feature_store(price_store, closes=()):
+    """
+    Open the features for a price store, backfilling them if missing or built
+    with other parameters, then stream any (date, price) closes newer than
+    the last stored bar. Serving code passes no closes and never appends.
+    """
+    directory = os.path.join(price_store.directory, FEATURES_DIRNAME)
+    store = _open_current(directory)
+    if store is None:
+        with _writer_lock(directory):
+            # Another process may have backfilled while this one waited for the lock
+            if _open_current(directory) is None:
+                _backfill(price_store, directory)
+        store = FeatureStore(directory)
+    if closes:
+        store.extend(closes)
+    return store
+
+
+if __name__ == '__main__':
+    from finetune import read_closes
+    from price_store import load_price_store
+
+    features = load_feature_store(load_price_store(Config.DATASET_PATH), read_closes())
+    print(f"{len(features)} rows through {features.last_date}: {', '.join(features.manifest['columns'])}")
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+
+"""
+Incremental fine-tuning of the LSTM on newly ingested daily closes.
+
+Instead of the notebook's 150-epoch retrain, the job warm-starts from the
+current model and runs a few epochs over a replay buffer: every recent
+window plus a random sample of historical ones. The most recent windows are
+held out, and the new model is published only if holdout error does not
+regress. Each run reports its CPU cost and stops early once the CPU budget
+is spent; the reports of recent runs are kept whether or not they published.
+
+A published model, its price window and metadata form one release directory
+under models/releases/. The ``CURRENT`` pointer is swapped with a single
+atomic rename, so readers always get a model and window from the same run.
+
+Usage:
+    python backend/finetune.py --ingest 2023-08-18 1889.30
+    python backend/finetune.py --run
+"""
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import joblib
+import numpy as np
+
+from config import CURRENT_FILE, Config, artifact_paths, releases_dir
+from feature_store import load_feature_store
+from model_bundle import prune_versions, write_atomic
+from price_store import load_price_store
+
+WINDOW_SIZE = Config.WINDOW_SIZE
+CLOSES_FIELDS = ['Date', 'Price']
+META_FILE = 'model_meta.json'
+RUNS_FILE = 'finetune_runs.json'
+
+
+def closes_path():
+    """Ingested closes live next to the base price window"""
+    return os.path.join(os.path.dirname(artifact_paths(release=False)[2]), 'daily_closes.csv')
+
+
+def runs_path():
+    return os.path.join(os.path.dirname(releases_dir()), RUNS_FILE)
+
+
+def meta_path(model_path):
+    return os.path.join(os.path.dirname(model_path), META_FILE)
+
+
+def load_model_meta(model_path):
+    """Training metadata published alongside the model, or {}"""
+    try:
+        with open(meta_path(model_path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_finetune_runs():
+    """Reports of the most recent fine-tune runs, oldest first, published or not"""
+    try:
+        with open(runs_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def record_finetune_run(report, history=Config.FINETUNE_RUN_HISTORY):
+    runs = (load_finetune_runs() + [report])[-history:]
+    os.makedirs(os.path.dirname(os.path.abspath(runs_path())), exist_ok=True)
+    write_atomic(os.path.abspath(runs_path()), json.dumps(runs, indent=2))
+
+
+def read_closes(path=None):
+    """Ingested daily closes as a list of (date string, price), sorted by date"""
+    path = path or closes_path()
+    if not os.path.exists(path):
+        return []
+    with open(path, newline='') as f:
+        return [(row['Date'], float(row['Price'])) for row in csv.DictReader(f)]
+
+
+def ingest_closes(closes, path=None):
+    """Merge (date, price) pairs into the daily closes file; later values win"""
+    path = path or closes_path()
+    merged = dict(read_closes(path))
+    for date, price in closes:
+        merged[datetime.strptime(date, '%Y-%m-%d').strftime('%Y-%m-%d')] = float(price)
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)))
+    with os.fdopen(fd, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(CLOSES_FIELDS)
+        for date in sorted(merged):
+            writer.writerow([date, merged[date]])
+    os.replace(tmp_path, path)
+    return len(merged)
+
+
+def load_price_history(dataset_path=None):
+    """(last date, closes) from the memory-mapped price store, or None without the dataset"""
+    dataset_path = dataset_path or Config.DATASET_PATH
+    if not os.path.exists(dataset_path):
+        return None
+    store = load_price_store(dataset_path)
+    return store.date_strings(len(store) - 1)[0], store.price
+
+
+def build_series(scaler, window, closes, history=None):
+    """
+    Raw price series to train on: the history (or, without the dataset, the
+    base price window) followed by any ingested closes newer than it.
+    """
+    if history is not None:
+        last_date, prices = history
+        series = list(prices)
+    else:
+        series = list(scaler.inverse_transform(np.asarray(window).reshape(-1, 1))[:, 0])
+        last_date = None
+    # Without the dataset the window's end date is unknown; trust every ingested close
+    series.extend(price for date, price in closes if last_date is None or date > last_date)
+    return np.asarray(series, dtype=np.float64)
+
+
+def training_series(scaler, closes):
+    """
+    Series for the next run. Without the dataset it starts from the base
+    window, never a release's: a published window already ends with the
+    ingested closes, which would then be appended a second time.
+    """
+    base_window = np.load(artifact_paths(release=False)[2])
+    return build_series(scaler, base_window, closes, load_price_history())
+
+
+def make_windows(scaled, start=WINDOW_SIZE, stop=None):
+    """Sliding windows (n, WINDOW_SIZE, 1) and next-step targets (n, 1) over scaled[start:stop]"""
+    stop = len(scaled) if stop is None else stop
+    targets = np.arange(start, stop)
+    X = np.lib.stride_tricks.sliding_window_view(scaled[:-1], WINDOW_SIZE)[targets - WINDOW_SIZE]
+    return X[..., None].astype(np.float32), scaled[targets, None].astype(np.float32)
+
+
+def replay_buffer(scaled, recent, historical, holdout, rng):
+    """Split windows into a training replay buffer and a most-recent holdout"""
+    n_windows = len(scaled) - WINDOW_SIZE
+    if n_windows < holdout + 1:
+        raise ValueError(f"Need more than {holdout} windows, have {n_windows}")
+
+    holdout_start = len(scaled) - holdout
+    recent_start = max(WINDOW_SIZE, holdout_start - recent)
+    older = np.arange(WINDOW_SIZE, recent_start)
+    sampled = rng.choice(older, size=min(historical, len(older)), replace=False) if len(older) else older
+
+    X, y = make_windows(scaled)
+    train = np.concatenate([sampled, np.arange(recent_start, holdout_start)]) - WINDOW_SIZE
+    return X[train], y[train], X[holdout_start - WINDOW_SIZE:], y[holdout_start - WINDOW_SIZE:]
+
+
+def run_finetune(epochs=Config.FINETUNE_EPOCHS, cpu_budget=Config.FINETUNE_CPU_BUDGET_SECONDS,
+                 recent=Config.FINETUNE_RECENT_WINDOWS, historical=Config.FINETUNE_HISTORICAL_SAMPLE,
+                 holdout=Config.FINETUNE_HOLDOUT_WINDOWS, learning_rate=Config.FINETUNE_LEARNING_RATE,
+                 threads=Config.FINETUNE_THREADS, seed=None):
+    """
+    Fine-tune the current model and publish it if holdout error does not regress.
+
+    Returns a report dict with the holdout errors, whether the model was
+    published and the training cost.
+    """
+    wall_start, cpu_start = time.monotonic(), time.process_time()
+    model_path, scaler_path, data_path = artifact_paths()
+
+    import tensorflow as tf  #type: ignore
+    if threads:
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(threads)
+
+    scaler = joblib.load(scaler_path)
+    closes = read_closes()
+    series = training_series(scaler, closes)
+    scaled = scaler.transform(series.reshape(-1, 1))[:, 0]
+
+    rng = np.random.default_rng(seed)
+    X_train, y_train, X_holdout, y_holdout = replay_buffer(scaled, recent, historical, holdout, rng)
+
+    model = tf.keras.models.load_model(model_path)  # type: ignore
+    model.compile(loss='mean_squared_error', optimizer=tf.keras.optimizers.Nadam(learning_rate=learning_rate))  # type: ignore
+    baseline = float(model.evaluate(X_holdout, y_holdout, verbose=0))
+
+    class CpuBudget(tf.keras.callbacks.Callback):  # type: ignore
+        """Stop training once the process has used its CPU budget"""
+        def on_train_batch_end(self, batch, logs=None):
+            if cpu_budget and time.process_time() - cpu_start > cpu_budget:
+                self.model.stop_training = True
+
+    train_cpu_start = time.process_time()
+    history = model.fit(X_train, y_train, epochs=epochs, batch_size=32, shuffle=True,
+                        callbacks=[CpuBudget()], verbose=0)
+    candidate = float(model.evaluate(X_holdout, y_holdout, verbose=0))
+
+    published = candidate <= baseline
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "holdout_mse_before": baseline,
+        "holdout_mse_after": candidate,
+        "published": published,
+        "train_windows": int(len(X_train)),
+        "holdout_windows": int(len(X_holdout)),
+        "epochs_run": len(history.history.get('loss', [])),
+        "cost": {
+            "cpu_seconds": round(time.process_time() - cpu_start, 2),
+            "train_cpu_seconds": round(time.process_time() - train_cpu_start, 2),
+            "wall_seconds": round(time.monotonic() - wall_start, 2),
+            "cpu_budget_seconds": cpu_budget,
+        }
+    }
+
+    if published:
+        report["release"] = publish_model(model, model_path, data_path, scaled, report, closes)
+    record_finetune_run(report)
+    print(json.dumps(report, indent=2))
+    return report
+
+
+def publish_model(model, model_path, data_path, scaled, report, closes, keep=Config.FINETUNE_KEEP_RELEASES):
+    """
+    Publish the model, window and metadata as a new release and make it current.
+
+    Returns the release id. The previous ``keep - 1`` releases are kept, so a
+    bad publish can be rolled back by writing an older id to ``CURRENT``.
+    """
+    directory = releases_dir()
+    os.makedirs(directory, exist_ok=True)
+    release_id = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+
+    meta = load_model_meta(model_path)
+    meta["last_training_date"] = closes[-1][0] if closes else meta.get("last_training_date")
+    meta["last_finetune"] = report
+    meta["release"] = release_id
+
+    staging = tempfile.mkdtemp(prefix=f'.{release_id}-', dir=directory)
+    try:
+        model.save(os.path.join(staging, os.path.basename(model_path)))
+        np.save(os.path.join(staging, os.path.basename(data_path)), scaled[-WINDOW_SIZE:].reshape(-1, 1))
+        with open(os.path.join(staging, META_FILE), 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.rename(staging, os.path.join(directory, release_id))
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    write_atomic(os.path.join(directory, CURRENT_FILE), release_id)
+    prune_versions(directory, keep=keep, current=release_id)
+    return release_id
+
+
+def start_finetune_scheduler(interval_hours, on_publish=None):
+    """
+    Run the fine-tune every ``interval_hours`` in a background thread.
+
+    Each run is a separate process so training never competes with serving
+    for the interpreter; ``on_publish`` is called after a new model lands.
+    """
+    def loop():
+        while True:
+            time.sleep(interval_hours * 3600)
+            print("Starting scheduled fine-tune")
+            result = subprocess.run([sys.executable, os.path.abspath(__file__), '--run'])
+            if result.returncode == 0 and on_publish is not None:
+                on_publish()
+
+    thread = threading.Thread(target=loop, name='finetune-scheduler', daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental fine-tuning of the gold price LSTM")
+    parser.add_argument('--ingest', nargs=2, action='append', metavar=('DATE', 'PRICE'),
+                        help="Add a daily close (YYYY-MM-DD PRICE); may be repeated")
+    parser.add_argument('--run', action='store_true', help="Run one fine-tuning update")
+    parser.add_argument('--epochs', type=int, default=Config.FINETUNE_EPOCHS)
+    parser.add_argument('--cpu-budget', type=float, default=Config.FINETUNE_CPU_BUDGET_SECONDS)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.ingest:
+        total = ingest_closes(args.ingest)
+        print(f"Ingested {len(args.ingest)} closes ({total} total)")
+        # Stream the new bars into the indicator store
+        if os.path.exists(Config.DATASET_PATH):
+            features = load_feature_store(load_price_store(Config.DATASET_PATH), read_closes())
+            print(f"Features updated through {features.last_date}")
+    if args.run:
+        try:
+            report = run_finetune(epochs=args.epochs, cpu_budget=args.cpu_budget, seed=args.seed)
+        except ValueError as e:
+            print(f"Fine-tune skipped: {e}")
+            return 2
+        return 0 if report["published"] else 3
+    if not args.ingest and not args.run:
+        parser.print_help()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+HTTP conditional caching helpers for the deterministic forecast endpoints.
+
+Forecasts only change when the model, the input window or the calendar day
+changes, so responses carry a strong ETag derived from those inputs and a
+Cache-Control lifetime that expires at the next data refresh.
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import make_response, request  #type: ignore
+
+
+def strong_etag(*parts):
+    """Build a strong validator from the given parts (bytes or anything str()-able)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, (bytes, bytearray, memoryview)):
+            part = str(part).encode('utf-8')
+        digest.update(part)
+        digest.update(b'\0')
+    return digest.hexdigest()[:32]
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def seconds_until_refresh(refresh_hour=0, now=None):
+    """Seconds until the next data refresh or calendar rollover, whichever comes first"""
+    now = now or datetime.now()
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    refresh = now.replace(hour=refresh_hour, minute=0, second=0, microsecond=0)
+    if refresh <= now:
+        refresh += timedelta(days=1)
+    return max(int((min(refresh, midnight) - now).total_seconds()), 1)
+
+
+def conditional(validator, refresh_hour=0):
+    """
+    Serve a view with a strong ETag and honor If-None-Match with 304.
+
+    ``validator`` is called before the view runs and returns the ETag for the
+    current request, or None to skip caching (e.g. while the model is not
+    loaded). A matching If-None-Match short-circuits the view entirely, so
+    revalidations never reach the model.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = validator()
+            if etag is None:
+                return view(*args, **kwargs)
+
+            # If-None-Match uses the weak comparison (RFC 9110 13.1.2); CDNs that
+            # compress responses send the tag back as W/"..."
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.cache_control.no_store:
+                    return response
+
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = f'public, max-age={seconds_until_refresh(refresh_hour)}'
+            # CORS headers depend on the Origin, so shared caches must key on it
+            response.vary.add('Origin')
+            return response
+        return wrapper
+    return decorator
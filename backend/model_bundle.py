@@ -0,0 +1,137 @@
+"""
+Versioned, memory-mappable model bundles for multi-worker serving.
+
+A bundle is a directory holding the exported LSTM weights, the scaled price
+window and the scaler. Bundles are immutable; the ``CURRENT`` pointer file
+names the live one and is swapped with an atomic rename, so every worker
+moves from one complete bundle to the next without ever seeing a mix.
+"""
+
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+import joblib
+import numpy as np
+
+from http_cache import file_digest, strong_etag
+from numpy_model import NumpyLSTMModel, export_weights
+
+CURRENT_FILE = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+WINDOW_FILE = 'window.npy'
+SCALER_FILE = 'scaler.pkl'
+
+
+def _export_model(model_path, directory):
+    """Runs in a spawned process so the parent never initialises TensorFlow"""
+    import tensorflow as tf  #type: ignore
+    export_weights(tf.keras.models.load_model(model_path), directory)  # type: ignore
+
+
+def publish_bundle(bundles_dir, model_path, scaler_path, data_path, keep=2):
+    """
+    Export the artifacts into a new bundle and make it current.
+
+    Returns the bundle id. Artifacts that are already published are not
+    exported again.
+    """
+    window = np.load(data_path)
+    model_version = file_digest(model_path)
+    window_version = strong_etag(window.dtype.str, window.shape, window.tobytes())
+    bundle_id = strong_etag(model_version, window_version, file_digest(scaler_path))[:16]
+
+    bundle_dir = os.path.join(bundles_dir, bundle_id)
+    if not os.path.exists(bundle_dir):
+        os.makedirs(bundles_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f'.{bundle_id}-', dir=bundles_dir)
+        try:
+            exporter = multiprocessing.get_context('spawn').Process(
+                target=_export_model, args=(model_path, staging))
+            exporter.start()
+            exporter.join()
+            if exporter.exitcode != 0:
+                raise RuntimeError(f"Weight export failed with exit code {exporter.exitcode}")
+
+            np.save(os.path.join(staging, WINDOW_FILE), np.ascontiguousarray(window))
+            shutil.copyfile(scaler_path, os.path.join(staging, SCALER_FILE))
+            with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+                json.dump({
+                    "bundle_id": bundle_id,
+                    "model_version": model_version,
+                    "window_version": window_version,
+                    "model_path": os.path.abspath(model_path),
+                    "created": datetime.now().isoformat()
+                }, f, indent=2)
+            os.rename(staging, bundle_dir)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+    write_atomic(os.path.join(bundles_dir, CURRENT_FILE), bundle_id)
+    prune_versions(bundles_dir, keep=keep, current=bundle_id)
+    return bundle_id
+
+
+def write_atomic(path, text):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def prune_versions(bundles_dir, keep, current):
+    """Remove all but the newest ``keep`` versions; workers still mapping one keep their pages"""
+    bundles = [
+        os.path.join(bundles_dir, name) for name in os.listdir(bundles_dir)
+        if not name.startswith('.') and name != current and os.path.isdir(os.path.join(bundles_dir, name))
+    ]
+    bundles.sort(key=os.path.getmtime, reverse=True)
+    for path in bundles[max(keep - 1, 0):]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def current_bundle_id(bundles_dir):
+    """Id of the live bundle, or None if nothing has been published"""
+    try:
+        with open(os.path.join(bundles_dir, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+class Bundle:
+    """A loaded bundle: mmap'd model weights, mmap'd window and the scaler"""
+
+    def __init__(self, bundles_dir, bundle_id):
+        directory = os.path.join(bundles_dir, bundle_id)
+        with open(os.path.join(directory, MANIFEST_FILE)) as f:
+            self.manifest = json.load(f)
+        self.bundle_id = bundle_id
+        self.model = NumpyLSTMModel(directory, mmap_mode='r')
+        self.window = np.load(os.path.join(directory, WINDOW_FILE), mmap_mode='r')
+        self.scaler = joblib.load(os.path.join(directory, SCALER_FILE))
+        self.model_version = self.manifest["model_version"]
+        self.window_version = self.manifest["window_version"]
+
+
+def memory_usage(pid=None):
+    """RSS, PSS and shared memory of a process in MB, read from /proc (Linux only)"""
+    pid = pid or os.getpid()
+    usage = {"pid": pid}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            fields = {line.split(':')[0]: line.split()[1] for line in f if ':' in line}
+    except OSError:
+        return usage
+
+    def mb(*keys):
+        return round(sum(int(fields.get(k, 0)) for k in keys) / 1024, 1)
+
+    usage["rss_mb"] = mb('Rss')
+    usage["pss_mb"] = mb('Pss')
+    usage["shared_mb"] = mb('Shared_Clean', 'Shared_Dirty')
+    return usage
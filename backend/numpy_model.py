@@ -0,0 +1,113 @@
+"""
+NumPy inference for the exported LSTM model.
+
+Serving workers run the forward pass directly on weight arrays that are
+memory-mapped from a bundle on disk, so they need neither TensorFlow nor a
+private copy of the weights. Only the layers used by the training notebook
+(InputLayer, LSTM, Dropout, Dense) are supported.
+"""
+
+import json
+import os
+
+import numpy as np
+
+ARCHITECTURE_FILE = 'architecture.json'
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0),
+    'tanh': np.tanh,
+    'sigmoid': lambda x: 1 / (1 + np.exp(-x)),
+}
+
+
+def _softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+ACTIVATIONS['softmax'] = _softmax
+
+
+def export_weights(keras_model, directory):
+    """Write the layer specs and weights of a Keras model as plain .npy files"""
+    os.makedirs(directory, exist_ok=True)
+    layers = []
+    for layer in keras_model.layers:
+        kind = type(layer).__name__
+        if kind in ('InputLayer', 'Dropout'):
+            continue
+        if kind not in ('LSTM', 'Dense'):
+            raise ValueError(f"Unsupported layer for NumPy inference: {kind}")
+
+        config = layer.get_config()
+        spec = {'type': kind, 'weights': []}
+        if kind == 'LSTM':
+            spec['units'] = config['units']
+            spec['activation'] = config['activation']
+            spec['recurrent_activation'] = config['recurrent_activation']
+            spec['return_sequences'] = config['return_sequences']
+        else:
+            spec['activation'] = config['activation']
+
+        for i, weight in enumerate(layer.get_weights()):
+            name = f"{len(layers):02d}_{kind.lower()}_{i}.npy"
+            np.save(os.path.join(directory, name), np.ascontiguousarray(weight, dtype=np.float32))
+            spec['weights'].append(name)
+        layers.append(spec)
+
+    with open(os.path.join(directory, ARCHITECTURE_FILE), 'w') as f:
+        json.dump({'layers': layers}, f, indent=2)
+
+
+class NumpyLSTMModel:
+    """Keras-compatible ``predict`` over memory-mapped weights"""
+
+    def __init__(self, directory, mmap_mode='r'):
+        with open(os.path.join(directory, ARCHITECTURE_FILE)) as f:
+            self.layers = json.load(f)['layers']
+        self.weights = [
+            [np.load(os.path.join(directory, name), mmap_mode=mmap_mode) for name in spec['weights']]
+            for spec in self.layers
+        ]
+
+    def _lstm(self, spec, weights, x):
+        kernel, recurrent_kernel, bias = weights
+        units = spec['units']
+        activation = ACTIVATIONS[spec['activation']]
+        recurrent_activation = ACTIVATIONS[spec['recurrent_activation']]
+
+        batch, steps, _ = x.shape
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        # Input projections for every timestep in one matmul
+        projected = x @ kernel + bias
+        outputs = np.empty((batch, steps, units), dtype=np.float32) if spec['return_sequences'] else None
+
+        for t in range(steps):
+            z = projected[:, t, :] + h @ recurrent_kernel
+            i = recurrent_activation(z[:, :units])
+            f = recurrent_activation(z[:, units:2 * units])
+            g = activation(z[:, 2 * units:3 * units])
+            o = recurrent_activation(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * activation(c)
+            if outputs is not None:
+                outputs[:, t, :] = h
+
+        return outputs if outputs is not None else h
+
+    def predict(self, x, verbose=0, batch_size=None):
+        """Run the forward pass on inputs of shape (batch, steps, features)"""
+        x = np.asarray(x, dtype=np.float32)
+        # Bound the (batch, steps, 4 * units) input projections like Keras batches do
+        if batch_size and len(x) > batch_size:
+            return np.concatenate([self.predict(x[i:i + batch_size]) for i in range(0, len(x), batch_size)])
+        for spec, weights in zip(self.layers, self.weights):
+            if spec['type'] == 'LSTM':
+                x = self._lstm(spec, weights, x)
+            else:
+                kernel, bias = weights
+                x = ACTIVATIONS[spec['activation']](x @ kernel + bias)
+        return x
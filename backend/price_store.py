@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+
+"""
+Binary columnar store for the raw gold price CSV.
+
+The CSV is parsed, cleaned (thousands separators stripped, cast to float64),
+sorted by date and validated once, then written as one .npy file per column
+plus an int64 date index (days since 1970-01-01). Stores are keyed by the
+SHA-256 of the source file, so conversion only re-runs when the CSV changes;
+every later load memory-maps the arrays.
+
+Usage:
+    python backend/price_store.py "dataset/gold prices.csv"
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from config import Config
+from http_cache import file_digest
+
+STORE_DIRNAME = '.price_store'
+MANIFEST_FILE = 'manifest.json'
+SOURCE_FILE = 'source.json'
+DATE_COLUMN = 'date'
+# Store column -> CSV column; Volume is dropped as in the notebook
+PRICE_COLUMNS = {'price': 'Close/Last', 'open': 'Open', 'high': 'High', 'low': 'Low'}
+
+
+class PriceStoreError(ValueError):
+    """Raised when the source CSV fails validation"""
+
+
+def store_root(csv_path):
+    return os.path.join(os.path.dirname(os.path.abspath(csv_path)), STORE_DIRNAME)
+
+
+def source_checksum(csv_path):
+    """SHA-256 of the CSV, reusing the last hash while size and mtime are unchanged"""
+    stat = os.stat(csv_path)
+    signature = [stat.st_size, stat.st_mtime_ns]
+    cache_path = os.path.join(store_root(csv_path), SOURCE_FILE)
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+        if cached.get('path') == os.path.abspath(csv_path) and cached.get('signature') == signature:
+            return cached['sha256']
+    except (OSError, ValueError, KeyError):
+        pass
+
+    checksum = file_digest(csv_path)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    # Replaced atomically so concurrent loaders never read a half-written cache
+    fd, tmp_path = tempfile.mkstemp(prefix='.source-', dir=os.path.dirname(cache_path))
+    with os.fdopen(fd, 'w') as f:
+        json.dump({'path': os.path.abspath(csv_path), 'signature': signature, 'sha256': checksum}, f)
+    os.replace(tmp_path, cache_path)
+    return checksum
+
+
+def parse_csv(csv_path):
+    """Parse, clean and validate the CSV; returns (int64 day index, {column: float64 array})"""
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    missing = [c for c in ['Date', *PRICE_COLUMNS.values()] if c not in df.columns]
+    if missing:
+        raise PriceStoreError(f"Missing columns in {csv_path}: {missing}")
+
+    dates = pd.to_datetime(df['Date']).to_numpy().astype('datetime64[D]')
+    order = np.argsort(dates, kind='stable')
+    dates = dates[order]
+
+    columns = {}
+    for name, source in PRICE_COLUMNS.items():
+        values = df[source]
+        if values.dtype == object:
+            values = values.str.replace(',', '', regex=False)
+        columns[name] = values.astype('float64').to_numpy()[order]
+
+    if len(dates) == 0:
+        raise PriceStoreError("No rows to store")
+    if (np.diff(dates.astype(np.int64)) <= 0).any():
+        raise PriceStoreError("Duplicate dates in source data")
+    for name, values in columns.items():
+        if not np.isfinite(values).all():
+            raise PriceStoreError(f"Non-numeric or missing values in column '{name}'")
+        if (values <= 0).any():
+            raise PriceStoreError(f"Non-positive values in column '{name}'")
+    if (columns['high'] < columns['low']).any():
+        raise PriceStoreError("High below Low in source data")
+
+    return dates.astype(np.int64), columns
+
+
+def build_store(csv_path, checksum):
+    """Convert the CSV into the store directory for ``checksum``"""
+    root = store_root(csv_path)
+    directory = os.path.join(root, checksum[:16])
+    if os.path.exists(directory):
+        return directory
+
+    dates, columns = parse_csv(csv_path)
+    os.makedirs(root, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.build-', dir=root)
+    try:
+        np.save(os.path.join(staging, f'{DATE_COLUMN}.npy'), dates)
+        for name, values in columns.items():
+            np.save(os.path.join(staging, f'{name}.npy'), values)
+            np.save(os.path.join(staging, f'{name}_f32.npy'), values.astype(np.float32))
+        with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+            json.dump({
+                "source": os.path.abspath(csv_path),
+                "sha256": checksum,
+                "rows": int(len(dates)),
+                "columns": [DATE_COLUMN, *columns],
+                "first_date": str(np.datetime64(int(dates[0]), 'D')),
+                "last_date": str(np.datetime64(int(dates[-1]), 'D')),
+                "created": datetime.now().isoformat()
+            }, f, indent=2)
+        os.rename(staging, directory)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        # Another process finished the same conversion first (EEXIST/ENOTEMPTY)
+        if not os.path.isdir(directory):
+            raise
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    # Stores for older versions of the CSV are no longer reachable
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if os.path.isdir(path) and not name.startswith('.') and path != directory:
+            shutil.rmtree(path, ignore_errors=True)
+    return directory
+
+
+class PriceStore:
+    """Memory-mapped columns of a converted price CSV"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST_FILE)) as f:
+            self.manifest = json.load(f)
+        self.dates = np.load(os.path.join(directory, f'{DATE_COLUMN}.npy'), mmap_mode='r')
+
+    def __len__(self):
+        return len(self.dates)
+
+    def column(self, name, dtype=np.float64):
+        """Memory-mapped column; float32 columns are stored pre-cast"""
+        suffix = '_f32' if np.dtype(dtype) == np.float32 else ''
+        return np.load(os.path.join(self.directory, f'{name}{suffix}.npy'), mmap_mode='r')
+
+    @property
+    def price(self):
+        return self.column('price')
+
+    def date_strings(self, start=0, stop=None):
+        return np.datetime_as_string(self.dates[start:stop].astype('datetime64[D]'))
+
+    def index_range(self, start_date=None, end_date=None):
+        """Row range [start, stop) covering the inclusive date range"""
+        def day(value):
+            return np.datetime64(value, 'D').astype(np.int64)
+        start = 0 if start_date is None else int(np.searchsorted(self.dates, day(start_date), side='left'))
+        stop = len(self) if end_date is None else int(np.searchsorted(self.dates, day(end_date), side='right'))
+        return start, stop
+
+    def to_frame(self):
+        """DataFrame in the notebook's layout: Date, Price, Open, High, Low"""
+        import pandas as pd
+
+        frame = {'Date': self.dates.astype('datetime64[D]').astype('datetime64[ns]')}
+        for name in PRICE_COLUMNS:
+            frame[name.capitalize()] = np.asarray(self.column(name))
+        return pd.DataFrame(frame)
+
+
+def load_price_store(csv_path=Config.DATASET_PATH):
+    """Open the store for the CSV, converting it first if the source changed"""
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"Price data not found at {csv_path}")
+    return PriceStore(build_store(csv_path, source_checksum(csv_path)))
+
+
+if __name__ == '__main__':
+    store = load_price_store(sys.argv[1] if len(sys.argv) > 1 else Config.DATASET_PATH)
+    print(json.dumps(store.manifest, indent=2))
@@ -0,0 +1,167 @@
+"""
+Opt-in request profiling for the inference path.
+
+Profiling is armed for the next N requests (optionally sampled) or forced
+for a single request by header. A profiled request records a tree of named
+stage spans plus a cProfile trace; both are aggregated across requests and
+exported as collapsed stacks (for flamegraph.pl / speedscope) and pstats.
+
+When no request is being profiled, ``stage()`` is a thread-local lookup
+returning a shared no-op context manager, so the spans can stay in place in
+production.
+"""
+
+import cProfile
+import marshal
+import pstats
+import random
+import threading
+import time
+from contextlib import nullcontext
+
+_NULL_STAGE = nullcontext()
+
+
+class _Trace:
+    """Spans and cProfile state for one profiled request"""
+
+    def __init__(self, name):
+        self.stack = [name]
+        self.spans = []  # (folded stack path, seconds)
+        self.started = time.perf_counter()
+        self.profile = cProfile.Profile()
+
+
+class _Span:
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.trace.stack.append(self.name)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        self.trace.spans.append((';'.join(self.trace.stack), elapsed))
+        self.trace.stack.pop()
+        return False
+
+
+class Profiler:
+    """Collects and aggregates per-request stage spans and cProfile stats"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._remaining = 0
+        self._sample_rate = 1.0
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._requests = 0
+            self._folded = {}  # stack path -> total seconds
+            self._stages = {}  # stage name -> [count, total, max]
+            self._stats = None
+
+    def arm(self, requests, sample_rate=1.0):
+        """Profile the next ``requests`` requests, each taken with ``sample_rate`` probability"""
+        with self._lock:
+            self._remaining = max(int(requests), 0)
+            self._sample_rate = min(max(float(sample_rate), 0.0), 1.0)
+
+    def stage(self, name):
+        """Context manager timing a named stage of the current request"""
+        trace = getattr(self._local, 'trace', None)
+        if trace is None:
+            return _NULL_STAGE
+        return _Span(trace, name)
+
+    def start_request(self, name, force=False):
+        """Begin profiling this request if forced or armed; returns whether it is profiled"""
+        if not force:
+            if not self._remaining:
+                return False
+            with self._lock:
+                if not self._remaining or random.random() >= self._sample_rate:
+                    return False
+                self._remaining -= 1
+
+        trace = _Trace(name)
+        self._local.trace = trace
+        trace.profile.enable()
+        return True
+
+    def finish_request(self):
+        """Stop profiling the current request and fold it into the aggregates"""
+        trace = getattr(self._local, 'trace', None)
+        if trace is None:
+            return None
+        trace.profile.disable()
+        self._local.trace = None
+        trace.spans.append((trace.stack[0], time.perf_counter() - trace.started))
+
+        with self._lock:
+            self._requests += 1
+            for path, elapsed in trace.spans:
+                # Store self time so the folded output sums correctly
+                self._folded[path] = self._folded.get(path, 0.0) + elapsed
+                parent = path.rpartition(';')[0]
+                if parent:
+                    self._folded[parent] = self._folded.get(parent, 0.0) - elapsed
+
+                name = path.rpartition(';')[2]
+                stage = self._stages.setdefault(name, [0, 0.0, 0.0])
+                stage[0] += 1
+                stage[1] += elapsed
+                stage[2] = max(stage[2], elapsed)
+
+            if self._stats is None:
+                self._stats = pstats.Stats(trace.profile)
+            else:
+                self._stats.add(trace.profile)
+        return trace
+
+    def server_timing(self, trace):
+        """Server-Timing header value for a finished trace's top-level stages"""
+        depth = 2
+        totals = {}
+        for path, elapsed in trace.spans:
+            parts = path.split(';')
+            if len(parts) == depth:
+                totals[parts[-1]] = totals.get(parts[-1], 0.0) + elapsed
+        return ', '.join(f'{name};dur={seconds * 1000:.2f}' for name, seconds in totals.items())
+
+    def summary(self):
+        with self._lock:
+            return {
+                "armed_remaining": self._remaining,
+                "sample_rate": self._sample_rate,
+                "profiled_requests": self._requests,
+                "stages": {
+                    name: {
+                        "count": count,
+                        "total_ms": round(total * 1000, 3),
+                        "mean_ms": round(total * 1000 / count, 3),
+                        "max_ms": round(peak * 1000, 3),
+                    }
+                    for name, (count, total, peak) in sorted(self._stages.items(), key=lambda s: -s[1][1])
+                },
+            }
+
+    def folded(self):
+        """Collapsed stacks with microsecond self-time weights, one per line"""
+        with self._lock:
+            return ''.join(f'{path} {int(seconds * 1e6)}\n'
+                           for path, seconds in sorted(self._folded.items()) if seconds > 0)
+
+    def pstats_dump(self):
+        """Aggregated cProfile stats in the format written by pstats.Stats.dump_stats"""
+        with self._lock:
+            return marshal.dumps(self._stats.stats) if self._stats is not None else None
+
+
+profiler = Profiler()
+stage = profiler.stage
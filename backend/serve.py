@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+
+"""
+Pre-forked multi-worker server for the prediction API.
+
+The parent publishes the model, scaler and price window as a bundle of .npy
+files (see model_bundle.py), memory-maps it and forks the workers, which run
+the NumPy forward pass over the shared read-only pages. TensorFlow is only
+ever loaded in a short-lived export process, so each extra worker costs
+little more than its interpreter.
+
+Each worker serves requests on a bounded thread pool sized for the admission
+controller: MAX_CONCURRENT_PREDICTIONS running forecasts, MAX_QUEUED_PREDICTIONS
+waiting ones and a few spare threads, so load shedding, the fallback
+forecaster and the /api/health bypass work per worker just as in app.py.
+
+The parent polls the artifacts and publishes a new bundle when they change;
+workers switch to it at their next request. Per-worker memory is logged
+periodically and reported by /api/health.
+
+Usage:
+    python backend/serve.py --workers 4
+"""
+
+import argparse
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from werkzeug.serving import ThreadedWSGIServer, WSGIRequestHandler  #type: ignore
+
+import app as api
+from config import Config, artifact_paths
+from finetune import start_finetune_scheduler
+from model_bundle import Bundle, current_bundle_id, memory_usage, publish_bundle
+
+BUNDLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'bundles')
+# Threads beyond the admission budget, so health checks and bulk jobs never wait behind forecasts
+SPARE_THREADS = 4
+
+
+def default_threads():
+    return Config.MAX_CONCURRENT_PREDICTIONS + Config.MAX_QUEUED_PREDICTIONS + SPARE_THREADS
+
+
+class OneRequestHandler(WSGIRequestHandler):
+    # No keep-alive: an idle connection must not hold one of the bounded threads
+    protocol_version = "HTTP/1.0"
+
+
+class BoundedThreadedWSGIServer(ThreadedWSGIServer):
+    """Threaded server handling at most ``max_threads`` requests at once; the rest wait in the listen backlog"""
+
+    def __init__(self, *args, max_threads, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._request_slots = threading.BoundedSemaphore(max_threads)
+
+    def process_request(self, request, client_address):
+        self._request_slots.acquire()
+        try:
+            super().process_request(request, client_address)
+        except Exception:
+            self._request_slots.release()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self._request_slots.release()
+
+
+def artifact_signature(paths):
+    """Cheap change detector for the source artifacts, including a switch to a new release"""
+    return tuple((p, os.stat(p).st_mtime_ns, os.stat(p).st_size) for p in paths)
+
+
+class BundleWatcher:
+    """Keeps a worker on the current bundle, checked once per request"""
+
+    def __init__(self, bundles_dir, bundle):
+        self.bundles_dir = bundles_dir
+        self.pointer = os.path.join(bundles_dir, 'CURRENT')
+        self.bundle = bundle
+        self.pointer_mtime = os.stat(self.pointer).st_mtime_ns
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        mtime = os.stat(self.pointer).st_mtime_ns
+        if mtime == self.pointer_mtime:
+            return
+        with self._lock:
+            if mtime == self.pointer_mtime:
+                return
+            self.pointer_mtime = mtime
+            bundle_id = current_bundle_id(self.bundles_dir)
+            if bundle_id and bundle_id != self.bundle.bundle_id:
+                # install_bundle swaps the artifacts in one assignment; in-flight requests keep their snapshot
+                self.bundle = Bundle(self.bundles_dir, bundle_id)
+                api.install_bundle(self.bundle)
+                print(f"[worker {os.getpid()}] switched to bundle {bundle_id}")
+
+
+def run_worker(sock, bundle, threads):
+    """Serve requests on the inherited listening socket until terminated"""
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    watcher = BundleWatcher(BUNDLES_DIR, bundle)
+    api.app.before_request(watcher.refresh)
+
+    server = BoundedThreadedWSGIServer(sock.getsockname()[0], sock.getsockname()[1], api.app,
+                                       handler=OneRequestHandler, fd=sock.fileno(), max_threads=threads)
+    print(f"[worker {os.getpid()}] serving bundle {bundle.bundle_id} on {threads} threads")
+    server.serve_forever()
+
+
+def spawn_worker(sock, bundle, threads):
+    pid = os.fork()
+    if pid == 0:
+        try:
+            run_worker(sock, bundle, threads)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def report_memory(workers):
+    parent = memory_usage()
+    print(f"[parent {parent['pid']}] rss={parent.get('rss_mb')}MB pss={parent.get('pss_mb')}MB")
+    for pid in workers:
+        usage = memory_usage(pid)
+        print(f"[worker {pid}] rss={usage.get('rss_mb')}MB pss={usage.get('pss_mb')}MB "
+              f"shared={usage.get('shared_mb')}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-forked Gold Price Prediction API server")
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_CONCURRENCY', 2)))
+    parser.add_argument('--threads', type=int, default=default_threads(),
+                        help="Request threads per worker (default: admission slots + queue + spare)")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 5000)))
+    parser.add_argument('--poll-interval', type=float, default=30.0,
+                        help="Seconds between checks for changed model artifacts")
+    parser.add_argument('--stats-interval', type=float, default=300.0,
+                        help="Seconds between per-worker memory reports")
+    args = parser.parse_args()
+
+    paths = artifact_paths()
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"Artifact not found: {path}")
+            return 1
+
+    bundle_id = publish_bundle(BUNDLES_DIR, *paths)
+    signature = artifact_signature(paths)
+    bundle = Bundle(BUNDLES_DIR, bundle_id)
+    api.install_bundle(bundle)
+    print(f"Published bundle {bundle_id}")
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(128)
+    sock.set_inheritable(True)
+    print(f"Listening on http://{args.host}:{args.port} with {args.workers} workers x {args.threads} threads")
+
+    workers = {spawn_worker(sock, bundle, args.threads) for _ in range(args.workers)}
+
+    # Published fine-tunes are picked up by the artifact poll below
+    if Config.FINETUNE_INTERVAL_HOURS > 0:
+        start_finetune_scheduler(Config.FINETUNE_INTERVAL_HOURS)
+
+    stopping = False
+
+    def stop(*_):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    next_poll = time.monotonic() + args.poll_interval
+    next_stats = time.monotonic() + min(args.stats_interval, 5.0)
+    while not stopping:
+        # Replace workers that died
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            pid = 0
+        if pid in workers:
+            workers.discard(pid)
+            if not stopping:
+                print(f"[worker {pid}] exited, restarting")
+                workers.add(spawn_worker(sock, bundle, args.threads))
+
+        now = time.monotonic()
+        if now >= next_poll:
+            next_poll = now + args.poll_interval
+            try:
+                # Re-resolved each poll: a published fine-tune moves the model and window together
+                paths = artifact_paths()
+                new_signature = artifact_signature(paths)
+                if new_signature != signature:
+                    bundle_id = publish_bundle(BUNDLES_DIR, *paths)
+                    bundle = Bundle(BUNDLES_DIR, bundle_id)
+                    signature = new_signature
+                    print(f"Published bundle {bundle_id}")
+            except Exception as e:
+                print(f"Error publishing bundle: {e}")
+
+        if now >= next_stats:
+            next_stats = now + args.stats_interval
+            report_memory(workers)
+
+        time.sleep(0.5)
+
+    for pid in workers:
+        os.kill(pid, signal.SIGTERM)
+    for pid in workers:
+        os.waitpid(pid, 0)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Tests for the bulk forecast endpoint.
+
+Checks that the batched rollout in predict_bulk matches the per-window
+predict_multiple_days loop, that malformed requests get 400 rather than 500,
+that date-range selections never wrap around, and that only one bulk job runs
+at a time. Uses a small Keras model exported to the NumPy forward pass.
+Run directly or with pytest.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sklearn.preprocessing import MinMaxScaler  #type: ignore
+
+import app as api
+from admission import Overloaded, ProcessSlot
+from config import Config
+from numpy_model import NumpyLSTMModel, export_weights
+from test_feature_store import synthetic_bars, write_csv
+from test_numpy_model import build_keras_model
+
+_ARTIFACTS = None
+
+
+def artifacts():
+    """Small NumPy model plus a scaler fitted on synthetic prices, built once"""
+    global _ARTIFACTS
+    if _ARTIFACTS is None:
+        directory = tempfile.mkdtemp()
+        export_weights(build_keras_model(), directory)
+        close, _, _ = synthetic_bars(400)
+        scaler = MinMaxScaler().fit(close.reshape(-1, 1))
+        window = scaler.transform(close[-60:].reshape(-1, 1))
+        _ARTIFACTS = api.Artifacts(NumpyLSTMModel(directory), scaler, window, 'model', 'window')
+    return _ARTIFACTS
+
+
+def test_bulk_matches_single_window_forecast():
+    current = artifacts()
+    close, _, _ = synthetic_bars(400)
+    windows = np.lib.stride_tricks.sliding_window_view(close, 60)[::37]
+
+    expected = np.array([
+        api.predict_multiple_days(current.scaler.transform(w.reshape(-1, 1)), days=7, current=current)
+        for w in windows
+    ])
+    for batch_size in (1, 4, 1024):
+        actual = api.predict_bulk(windows, days=7, current=current, batch_size=batch_size)
+        assert actual.shape == expected.shape
+        assert np.allclose(actual, expected, rtol=1e-5), np.abs(actual - expected).max()
+
+
+def test_malformed_requests_get_400():
+    api.artifacts = artifacts()
+    client = api.app.test_client()
+
+    assert client.post('/api/predict/bulk', json=[[1.0] * 60]).status_code == 400
+    assert client.post('/api/predict/bulk', json={"windows": [[1.0] * 60], "days": "x"}).status_code == 400
+    assert client.post('/api/predict/bulk', json={"windows": [[1.0] * 59]}).status_code == 400
+    body = np.ones(60, dtype=np.float64).tobytes()
+    assert client.post('/api/predict/bulk?dtype=foo', data=body).status_code == 400
+    assert client.post('/api/predict/bulk?dtype=float32', data=body[:100]).status_code == 400
+
+    response = client.post('/api/predict/bulk?dtype=float32', data=np.full(120, 1800, np.float32).tobytes())
+    assert response.status_code == 200, response.json
+    assert len(response.json["trajectories"]) == 2
+
+
+def test_date_range_before_first_window_is_empty():
+    api.artifacts = artifacts()
+    client = api.app.test_client()
+    close, high, low = synthetic_bars(400)
+    dataset_path = Config.DATASET_PATH
+    with tempfile.TemporaryDirectory() as directory:
+        Config.DATASET_PATH = os.path.join(directory, 'prices.csv')
+        try:
+            write_csv(Config.DATASET_PATH, close, high, low, start='2021-01-01')
+            # Rows 0-19 all fall before the first complete window (row 59)
+            response = client.post('/api/predict/bulk', json={"start": "2021-01-01", "end": "2021-01-20"})
+            assert response.status_code == 400, response.json
+
+            response = client.post('/api/predict/bulk', json={"start": "2021-01-01", "end": "2021-03-05"})
+            assert response.status_code == 200, response.json
+            # Rows 59-63 (2021-03-01 to 2021-03-05)
+            assert response.json["windows"] == 5
+        finally:
+            Config.DATASET_PATH = dataset_path
+
+
+def test_over_budget_job_gets_503():
+    api.artifacts = artifacts()
+    slot = api.bulk_admission
+    with tempfile.TemporaryDirectory() as directory:
+        api.bulk_admission = ProcessSlot(os.path.join(directory, 'bulk.lock'), budget=0.0)
+        try:
+            response = api.app.test_client().post('/api/predict/bulk', json={"windows": [[1800.0] * 60]})
+        finally:
+            api.bulk_admission = slot
+    assert response.status_code == 503, response.json
+    assert int(response.headers['Retry-After']) >= 1
+
+
+def test_one_bulk_job_at_a_time():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bulk.lock')
+        slot, other = ProcessSlot(path, budget=30), ProcessSlot(path, budget=30)
+        with slot.admit() as ticket:
+            assert ticket.remaining() > 29
+            try:
+                with other.admit():
+                    pass
+            except Overloaded as e:
+                assert 1 <= e.retry_after <= 30
+            else:
+                raise AssertionError("a second bulk job should have been rejected")
+        with other.admit():
+            pass
+
+
+if __name__ == '__main__':
+    for test in (test_bulk_matches_single_window_forecast, test_malformed_requests_get_400,
+                 test_date_range_before_first_window_is_empty, test_over_budget_job_gets_503,
+                 test_one_bulk_job_at_a_time):
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
@@ -0,0 +1,147 @@
+"""
+Tests for the technical-indicator feature store.
+
+Checks that streaming bars through IndicatorState reproduces the vectorized
+backfill, that appended rows survive a reload, and that concurrent or
+interrupted writers never leave the columns misaligned with the manifest.
+Run directly or with pytest.
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from feature_store import FEATURE_COLUMNS, DATE_COLUMN, FeatureStore, compute_indicators, load_feature_store
+from price_store import load_price_store
+
+
+def synthetic_bars(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 1800 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    high = close * (1 + rng.uniform(0, 0.01, n))
+    low = close * (1 - rng.uniform(0, 0.01, n))
+    return close, high, low
+
+
+def write_csv(path, close, high, low, start='2020-01-01'):
+    dates = np.datetime64(start) + np.arange(len(close))
+    with open(path, 'w') as f:
+        f.write('Date,Close/Last,Volume,Open,High,Low\n')
+        # Newest first, as in the source data
+        for i in reversed(range(len(close))):
+            day = str(dates[i].astype(object).strftime('%m/%d/%Y'))
+            f.write(f'{day},{close[i]},0,{close[i]},{high[i]},{low[i]}\n')
+
+
+def assert_features_equal(actual, expected, rows=None):
+    for name in FEATURE_COLUMNS:
+        a = np.asarray(actual[name])[:rows]
+        e = np.asarray(expected[name])[:rows]
+        assert np.allclose(a, e, rtol=1e-9, atol=1e-9, equal_nan=True), \
+            f"{name}: max diff {np.nanmax(np.abs(a - e))}"
+
+
+def test_streaming_matches_bulk():
+    close, high, low = synthetic_bars()
+    expected, _ = compute_indicators(close, high, low)
+
+    for k in (1, 15, 60, 250):
+        backfilled, state = compute_indicators(close[:k], high[:k], low[:k])
+        streamed = {name: list(backfilled[name]) for name in FEATURE_COLUMNS}
+        for i in range(k, len(close)):
+            row = state.update(float(close[i]), float(high[i]), float(low[i]))
+            for name in FEATURE_COLUMNS:
+                streamed[name].append(row[name])
+        assert_features_equal(streamed, expected)
+
+
+def test_append_reload_round_trip():
+    close, high, low = synthetic_bars(200)
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'prices.csv')
+        write_csv(csv_path, close[:150], high[:150], low[:150])
+        price_store = load_price_store(csv_path)
+        store = load_feature_store(price_store)
+        assert len(store) == 150
+
+        dates = np.datetime64('2020-01-01') + np.arange(200)
+        closes = [(str(dates[i]), float(close[i])) for i in range(150, 200)]
+        assert store.extend(closes[:30]) == 30
+        # Already stored closes are skipped
+        store = load_feature_store(price_store, closes)
+        assert len(store) == 200
+
+        reloaded = FeatureStore(store.directory)
+        assert len(reloaded) == 200
+        assert reloaded.last_date == str(dates[-1])
+        assert np.array_equal(reloaded.dates, dates.astype(np.int64))
+
+        # Ingested closes carry no high/low
+        expected, _ = compute_indicators(close, np.r_[high[:150], close[150:]], np.r_[low[:150], close[150:]])
+        assert_features_equal({name: reloaded.column(name) for name in FEATURE_COLUMNS}, expected)
+
+        try:
+            reloaded.append(str(dates[-1]), 1900.0)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("appending an old bar should fail")
+
+
+def test_orphan_rows_are_dropped():
+    close, high, low = synthetic_bars(100)
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'prices.csv')
+        write_csv(csv_path, close, high, low)
+        store = load_feature_store(load_price_store(csv_path))
+
+        # A writer that died after appending to some columns but before committing
+        with open(store._path(DATE_COLUMN), 'ab') as f:
+            f.write(np.int64(0).tobytes())
+        with open(store._path('close'), 'ab') as f:
+            f.write(np.float64(1.0).tobytes())
+
+        store.append('2020-04-10', 2000.0)
+        store = FeatureStore(store.directory)
+        assert store.last_date == '2020-04-10'
+        assert store.column('close')[-1] == 2000.0
+        assert store.column('close')[-2] == close[-1]
+        for name in [DATE_COLUMN, *FEATURE_COLUMNS]:
+            assert os.path.getsize(store._path(name)) == len(store) * 8, name
+
+
+def _extend(args):
+    csv_path, closes = args
+    load_feature_store(load_price_store(csv_path), closes)
+
+
+def test_concurrent_writers_stay_aligned():
+    close, high, low = synthetic_bars(100)
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'prices.csv')
+        write_csv(csv_path, close, high, low)
+        closes = [('2020-04-10', 2000.0), ('2020-04-11', 2010.0)]
+
+        with multiprocessing.get_context('fork').Pool(4) as pool:
+            pool.map(_extend, [(csv_path, closes)] * 8)
+
+        store = load_feature_store(load_price_store(csv_path))
+        assert len(store) == 102
+        for name in [DATE_COLUMN, *FEATURE_COLUMNS]:
+            assert os.path.getsize(store._path(name)) == len(store) * 8, name
+        assert store.column('close')[-2:].tolist() == [2000.0, 2010.0]
+
+
+if __name__ == '__main__':
+    for test in (test_streaming_matches_bulk, test_append_reload_round_trip,
+                 test_orphan_rows_are_dropped, test_concurrent_writers_stay_aligned):
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
@@ -0,0 +1,138 @@
+"""
+Tests for incremental fine-tuning.
+
+Covers the training series (with and without the dataset), the replay buffer
+split, the holdout gate that decides whether a run is published, and repeated
+runs without the dataset, which must not append the ingested closes twice.
+End-to-end runs use a small Keras model in a scratch artifact directory.
+Run directly or with pytest.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+import joblib
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sklearn.preprocessing import MinMaxScaler  #type: ignore
+
+import finetune
+from config import Config, artifact_paths, current_release
+from test_numpy_model import build_keras_model
+
+WINDOW_SIZE = finetune.WINDOW_SIZE
+
+
+def test_build_series():
+    scaler = MinMaxScaler().fit(np.array([[1000.0], [2000.0]]))
+    window = scaler.transform(np.linspace(1500, 1559, WINDOW_SIZE).reshape(-1, 1))
+    closes = [('2023-08-17', 1.0), ('2023-08-18', 1600.0), ('2023-08-21', 1610.0)]
+
+    # Without the dataset every ingested close follows the window
+    series = finetune.build_series(scaler, window, closes)
+    assert np.allclose(series[:WINDOW_SIZE], np.linspace(1500, 1559, WINDOW_SIZE))
+    assert series[WINDOW_SIZE:].tolist() == [1.0, 1600.0, 1610.0]
+
+    # With it, only closes after the last stored date are added
+    series = finetune.build_series(scaler, window, closes, ('2023-08-17', np.array([1400.0, 1410.0])))
+    assert series.tolist() == [1400.0, 1410.0, 1600.0, 1610.0]
+
+
+def test_replay_buffer():
+    scaled = np.arange(WINDOW_SIZE + 100, dtype=np.float64)
+    rng = np.random.default_rng(0)
+    X_train, y_train, X_holdout, y_holdout = finetune.replay_buffer(scaled, recent=30, historical=20,
+                                                                    holdout=10, rng=rng)
+    assert X_train.shape == (50, WINDOW_SIZE, 1) and y_train.shape == (50, 1)
+    assert X_holdout.shape == (10, WINDOW_SIZE, 1)
+    # Every window is followed by its target, and the holdout is the most recent windows
+    assert np.all(X_train[:, -1, 0] + 1 == y_train[:, 0])
+    assert np.all(X_holdout[:, -1, 0] + 1 == y_holdout[:, 0])
+    assert y_holdout[:, 0].tolist() == scaled[-10:].tolist()
+    # The 30 recent windows are all used and nothing overlaps the holdout
+    assert set(scaled[-40:-10]) <= set(y_train[:, 0])
+    assert y_train.max() < y_holdout.min()
+
+    try:
+        finetune.replay_buffer(scaled[:WINDOW_SIZE + 10], recent=5, historical=5, holdout=10, rng=rng)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("too few windows for the holdout should fail")
+
+
+class ScratchArtifacts:
+    """Root-level model, scaler and window in a temporary working directory, without the dataset"""
+
+    def __enter__(self):
+        self.cwd = os.getcwd()
+        self.dataset_path = Config.DATASET_PATH
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+        Config.DATASET_PATH = os.path.join(self.directory.name, 'missing.csv')
+
+        prices = 1800 + 20 * np.sin(np.arange(WINDOW_SIZE) / 5)
+        scaler = MinMaxScaler().fit(np.array([[1700.0], [1900.0]]))
+        build_keras_model().save('gold_price_lstm_model.h5')
+        joblib.dump(scaler, 'gold_price_scaler.pkl')
+        np.save('last_60_prices.npy', scaler.transform(prices.reshape(-1, 1)))
+        self.base_prices = prices
+        return self
+
+    def __exit__(self, *exc):
+        os.chdir(self.cwd)
+        Config.DATASET_PATH = self.dataset_path
+        self.directory.cleanup()
+
+
+def ingest(count, start='2023-08-18'):
+    days = np.datetime64(start) + np.arange(count)
+    prices = 1800 + 20 * np.sin((WINDOW_SIZE + np.arange(count)) / 5)
+    finetune.ingest_closes([(str(d), float(p)) for d, p in zip(days, prices)])
+
+
+def test_publish_gate_and_repeat_runs():
+    with ScratchArtifacts() as scratch:
+        ingest(25)
+        scaler = joblib.load('gold_price_scaler.pkl')
+        closes = finetune.read_closes()
+
+        # A zero learning rate cannot raise holdout error, so the run publishes
+        report = finetune.run_finetune(epochs=1, learning_rate=0.0, holdout=5, threads=0, seed=0)
+        assert report["published"] and report["holdout_mse_after"] <= report["holdout_mse_before"]
+        release = current_release()
+        assert release is not None and os.path.basename(release) == report["release"]
+        assert artifact_paths()[0].startswith(release)
+        meta = finetune.load_model_meta(artifact_paths()[0])
+        assert meta["release"] == report["release"]
+        assert meta["last_training_date"] == closes[-1][0]
+
+        # The release window ends with the ingested closes; the next run must not add them again
+        series = finetune.training_series(scaler, closes)
+        assert len(series) == WINDOW_SIZE + 25
+        assert np.allclose(series[:WINDOW_SIZE], scratch.base_prices)
+        window = scaler.inverse_transform(np.load(artifact_paths()[2]))[:, 0]
+        assert np.allclose(window, series[-WINDOW_SIZE:])
+
+        # A diverging update is rejected: no new release, but the run is still recorded
+        report = finetune.run_finetune(epochs=3, learning_rate=5.0, holdout=5, threads=0, seed=0)
+        assert not report["published"] and "release" not in report
+        assert current_release() == release
+
+        runs = finetune.load_finetune_runs()
+        assert [run["published"] for run in runs] == [True, False]
+        with open(finetune.runs_path()) as f:
+            assert json.load(f)[-1]["timestamp"] == report["timestamp"]
+
+
+if __name__ == '__main__':
+    for test in (test_build_series, test_replay_buffer, test_publish_gate_and_repeat_runs):
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
@@ -0,0 +1,152 @@
+"""
+Tests for the HTTP conditional caching helpers.
+
+Checks that conditional() answers matching If-None-Match (strong or weak)
+with 304 and keeps the CORS headers, that degraded and error responses are
+never cached, and that Cache-Control lifetimes end at the data refresh hour.
+Run directly or with pytest.
+"""
+
+import os
+import sys
+from datetime import datetime
+
+from flask import Flask, jsonify  #type: ignore
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from http_cache import conditional, seconds_until_refresh
+
+ETAG = 'abc123'
+ORIGIN = 'http://localhost:5173'
+
+
+def make_app():
+    app = Flask(__name__)
+
+    @app.route('/ok')
+    @conditional(lambda: ETAG)
+    def ok():
+        return jsonify({"value": 1})
+
+    @app.route('/degraded')
+    @conditional(lambda: ETAG)
+    def degraded():
+        response = jsonify({"value": 1})
+        response.cache_control.no_store = True
+        return response
+
+    @app.route('/error')
+    @conditional(lambda: ETAG)
+    def error():
+        return jsonify({"error": "boom"}), 500
+
+    @app.route('/uncached')
+    @conditional(lambda: None)
+    def uncached():
+        return jsonify({"value": 1})
+
+    return app
+
+
+def test_etag_and_304():
+    client = make_app().test_client()
+    response = client.get('/ok')
+    assert response.status_code == 200
+    assert response.headers['ETag'] == f'"{ETAG}"'
+    assert response.headers['Cache-Control'].startswith('public, max-age=')
+
+    assert client.get('/ok', headers={'If-None-Match': f'"{ETAG}"'}).status_code == 304
+    # Compressing CDNs weaken the tag; If-None-Match must still match
+    assert client.get('/ok', headers={'If-None-Match': f'W/"{ETAG}"'}).status_code == 304
+    assert client.get('/ok', headers={'If-None-Match': '"other"'}).status_code == 200
+
+
+def test_304_keeps_cors_headers():
+    import app as api
+    from test_bulk import artifacts
+
+    api.artifacts = artifacts()
+    client = api.app.test_client()
+    first = client.get('/api/predict/next', headers={'Origin': ORIGIN})
+    assert first.status_code == 200
+
+    response = client.get('/api/predict/next', headers={'Origin': ORIGIN, 'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 304
+    assert response.headers['Access-Control-Allow-Origin'] == ORIGIN
+    assert 'Origin' in response.headers['Vary']
+    assert response.headers['ETag'] == first.headers['ETag']
+
+
+def test_validator_and_view_share_one_snapshot():
+    import app as api
+    from test_bulk import artifacts
+
+    loaded = artifacts()
+    api.artifacts = loaded
+    client = api.app.test_client()
+    etag = client.get('/api/predict/next').headers['ETag']
+
+    # A reload landing between the validator and the view must not change this request
+    predict = api.predict_next_price
+    def reload_then_predict(*args, **kwargs):
+        api.artifacts = loaded._replace(model_version='reloaded')
+        return predict(*args, **kwargs)
+    api.artifacts = loaded
+    api.predict_next_price = reload_then_predict
+    try:
+        assert client.get('/api/predict/next').headers['ETag'] == etag
+    finally:
+        api.predict_next_price = predict
+    assert client.get('/api/predict/next').headers['ETag'] != etag
+    api.artifacts = loaded
+
+
+def test_model_info_etag_tracks_finetune_runs():
+    import app as api
+    from test_bulk import artifacts
+
+    api.artifacts = artifacts()
+    client = api.app.test_client()
+    load_runs = api.load_finetune_runs
+    try:
+        api.load_finetune_runs = lambda: [{"timestamp": "2024-01-01T00:00:00", "published": False}]
+        first = client.get('/api/model/info')
+        api.load_finetune_runs = lambda: [{"timestamp": "2024-01-02T00:00:00", "published": False}]
+        second = client.get('/api/model/info', headers={'If-None-Match': first.headers['ETag']})
+    finally:
+        api.load_finetune_runs = load_runs
+    assert second.status_code == 200
+    assert second.json["last_finetune_run"]["timestamp"] == "2024-01-02T00:00:00"
+
+
+def test_no_store_and_errors_are_not_cached():
+    client = make_app().test_client()
+    for path in ('/degraded', '/error', '/uncached'):
+        response = client.get(path)
+        assert 'ETag' not in response.headers, path
+        assert 'public' not in response.headers.get('Cache-Control', ''), path
+    # Without a validator nothing short-circuits
+    assert client.get('/uncached', headers={'If-None-Match': f'"{ETAG}"'}).status_code == 200
+
+
+def test_seconds_until_refresh():
+    # Before the refresh hour: expires at the refresh
+    assert seconds_until_refresh(6, datetime(2024, 1, 1, 5, 59, 0)) == 60
+    # After it: expires at midnight, since forecast dates roll over
+    assert seconds_until_refresh(6, datetime(2024, 1, 1, 23, 0, 0)) == 3600
+    # Exactly at the refresh hour: the next one is a day away, midnight comes first
+    assert seconds_until_refresh(6, datetime(2024, 1, 1, 6, 0, 0)) == 18 * 3600
+    assert seconds_until_refresh(0, datetime(2024, 1, 1, 12, 0, 0)) == 12 * 3600
+    assert seconds_until_refresh(0, datetime(2024, 1, 1, 23, 59, 59, 900000)) == 1
+
+
+if __name__ == '__main__':
+    for test in (test_etag_and_304, test_304_keeps_cors_headers, test_validator_and_view_share_one_snapshot,
+                 test_model_info_etag_tracks_finetune_runs, test_no_store_and_errors_are_not_cached,
+                 test_seconds_until_refresh):
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
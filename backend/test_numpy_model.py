@@ -0,0 +1,66 @@
+"""
+Equivalence test for the NumPy LSTM forward pass used by serve.py workers.
+
+Builds a small Keras model with the notebook's layer types (stacked LSTMs,
+Dropout, Dense), exports it with export_weights and checks that
+NumpyLSTMModel.predict matches model.predict, in one batch and in chunks.
+Run directly or with pytest.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from numpy_model import NumpyLSTMModel, export_weights
+
+
+def build_keras_model(seed=0):
+    import tensorflow as tf  #type: ignore
+
+    tf.keras.utils.set_random_seed(seed)  # type: ignore
+    model = tf.keras.Sequential([  # type: ignore
+        tf.keras.layers.Input(shape=(60, 1)),  # type: ignore
+        tf.keras.layers.LSTM(16, return_sequences=True),  # type: ignore
+        tf.keras.layers.Dropout(0.2),  # type: ignore
+        tf.keras.layers.LSTM(8),  # type: ignore
+        tf.keras.layers.Dense(4, activation='relu'),  # type: ignore
+        tf.keras.layers.Dense(1),  # type: ignore
+    ])
+    # Non-zero biases so the bias path is exercised too
+    for layer in model.layers:
+        weights = layer.get_weights()
+        if weights:
+            weights[-1] = np.random.default_rng(seed).normal(0, 0.1, weights[-1].shape).astype(np.float32)
+            layer.set_weights(weights)
+    return model
+
+
+def test_numpy_predict_matches_keras():
+    model = build_keras_model()
+    x = np.random.default_rng(1).uniform(0, 1, (37, 60, 1)).astype(np.float32)
+    expected = model.predict(x, verbose=0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        export_weights(model, directory)
+        numpy_model = NumpyLSTMModel(directory, mmap_mode='r')
+
+        actual = numpy_model.predict(x)
+        assert actual.shape == expected.shape
+        assert np.allclose(actual, expected, atol=1e-5), np.abs(actual - expected).max()
+
+        # Chunked path, with a ragged final batch
+        chunked = numpy_model.predict(x, batch_size=8)
+        assert chunked.shape == expected.shape
+        assert np.allclose(chunked, expected, atol=1e-5), np.abs(chunked - expected).max()
+
+
+if __name__ == '__main__':
+    try:
+        test_numpy_predict_matches_keras()
+        print("✓ test_numpy_predict_matches_keras")
+    except AssertionError as e:
+        print(f"✗ test_numpy_predict_matches_keras: {e}")
@@ -0,0 +1,105 @@
+"""
+Overload test for the prediction admission control.
+
+Floods an AdmissionController with far more concurrent requests than it
+admits, using a sleep as a stand-in for model.predict, and checks that tail
+latency stays bounded by the queue budget plus one service time instead of
+growing with the backlog. Run directly or with pytest.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from admission import AdmissionController, Overloaded
+from fallback import exponential_smoothing_forecast
+
+SERVICE_TIME = 0.05
+QUEUE_TIMEOUT = 0.2
+CLIENTS = 64
+
+
+def simulate(controller, clients=CLIENTS, service_time=SERVICE_TIME):
+    """Fire ``clients`` concurrent requests; return latencies and outcome counts"""
+    latencies = []
+    outcomes = {"model": 0, "fallback": 0}
+    lock = threading.Lock()
+    start_gate = threading.Event()
+    window = np.linspace(0.4, 0.6, 60)
+
+    def client():
+        start_gate.wait()
+        started = time.monotonic()
+        try:
+            with controller.admit() as ticket:
+                time.sleep(service_time)
+                ticket.check()
+                outcome = "model"
+        except Overloaded:
+            exponential_smoothing_forecast(window, days=7)
+            outcome = "fallback"
+        elapsed = time.monotonic() - started
+        with lock:
+            latencies.append(elapsed)
+            outcomes[outcome] += 1
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    start_gate.set()
+    for t in threads:
+        t.join()
+    return np.array(latencies), outcomes
+
+
+def test_bounded_tail_latency():
+    controller = AdmissionController(max_concurrent=2, max_queued=8,
+                                     queue_timeout=QUEUE_TIMEOUT, deadline=1.0)
+    latencies, outcomes = simulate(controller)
+
+    p50, p99 = np.percentile(latencies, [50, 99])
+    # Unbounded queueing would take CLIENTS * SERVICE_TIME / 2 = 1.6s at the tail
+    bound = QUEUE_TIMEOUT + SERVICE_TIME + 0.15
+    print(f"p50={p50 * 1000:.1f}ms p99={p99 * 1000:.1f}ms max={latencies.max() * 1000:.1f}ms "
+          f"bound={bound * 1000:.0f}ms outcomes={outcomes}")
+
+    assert p99 <= bound, f"p99 latency {p99:.3f}s exceeds {bound:.3f}s"
+    assert outcomes["model"] >= 2
+    assert outcomes["fallback"] > 0
+    assert controller.stats()["in_flight"] == 0
+
+
+def test_retry_after_is_positive():
+    controller = AdmissionController(max_concurrent=1, max_queued=0, queue_timeout=0.01)
+    with controller.admit():
+        try:
+            with controller.admit():
+                pass
+        except Overloaded as e:
+            assert e.retry_after >= 1
+        else:
+            raise AssertionError("second request should have been rejected")
+
+
+def test_fallback_follows_linear_trend():
+    window = np.linspace(0.1, 0.7, 60)
+    step = window[1] - window[0]
+    forecast = exponential_smoothing_forecast(window, days=3)
+    assert np.allclose(forecast, window[-1] + step * np.arange(1, 4))
+
+    batch = np.stack([window, window[::-1]])
+    assert exponential_smoothing_forecast(batch, days=3).shape == (2, 3)
+
+
+if __name__ == '__main__':
+    for test in (test_bounded_tail_latency, test_retry_after_is_positive, test_fallback_follows_linear_trend):
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")